@@ -0,0 +1,185 @@
+"""
+Benchmark: one reader thread per child vs. the shared ProcessSupervisor.
+
+Spawns N fake yt-dlp children that print timestamped progress lines and
+reports parent CPU time, thread count and line delivery latency.
+
+With --tk the lines go into a Tk Text widget the way the app delivers them:
+one after() call per line from the reader threads (the old _log), or the
+supervisor's queue drained every LOG_FLUSH_MS. Latency is then measured to
+the widget, and "tick p99" is how late a 10 ms Tk heartbeat fires, i.e. how
+responsive the UI stays. Needs a display.
+
+    python bench_supervisor.py [--tk] [children] [seconds] [lines_per_sec]
+"""
+
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+import tkinter as tk
+
+from kg_yt_downloader import LOG_FLUSH_MS, SUPERVISOR, _group_kwargs
+
+FAKE_CHILD = r"""
+import sys, time
+n, rate = int(sys.argv[1]), float(sys.argv[2])
+for i in range(n):
+    sys.stdout.write("%.6f [download]  %5.1f%% of ~ 52.31MiB at  3.21MiB/s ETA 00:12\n"
+                     % (time.time(), 100.0 * i / n))
+    sys.stdout.flush()
+    time.sleep(1 / rate)
+"""
+
+
+def _child_cmd(seconds, rate):
+    return [sys.executable, "-c", FAKE_CHILD, str(int(seconds * rate)), str(rate)]
+
+
+def _percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] * 1000 if values else 0.0
+
+
+def _latency(line):
+    return time.time() - float(line.split(" ", 1)[0])
+
+
+def bench_threads(children, seconds, rate, deliver=None):
+    lat, lock = [], threading.Lock()
+
+    def reader(cmd):
+        kwargs = {"stdout": subprocess.PIPE, "stderr": subprocess.STDOUT,
+                  "text": True, "bufsize": 1, **_group_kwargs()}
+        with subprocess.Popen(cmd, **kwargs) as proc:
+            for line in proc.stdout:
+                line = line.rstrip()
+                if not line:
+                    continue
+                if deliver:
+                    deliver(line)
+                else:
+                    with lock:
+                        lat.append(_latency(line))
+            proc.wait()
+
+    threads = [threading.Thread(target=reader, args=(_child_cmd(seconds, rate),))
+               for _ in range(children)]
+    for t in threads:
+        t.start()
+    peak = threading.active_count()
+    for t in threads:
+        t.join()
+    return lat, peak
+
+
+def bench_supervisor(children, seconds, rate, deliver=None):
+    lat = []
+
+    def on_line(line):
+        lat.append(_latency(line))
+
+    procs = [SUPERVISOR.spawn(_child_cmd(seconds, rate), on_line=deliver or on_line)
+             for _ in range(children)]
+    peak = threading.active_count()
+    for p in procs:
+        p.wait()
+    return lat, peak
+
+
+def bench_tk(children, seconds, rate):
+    root = tk.Tk()
+    text = tk.Text(root, height=10, width=100)
+    text.pack()
+
+    def append(lines, lat):
+        text.insert(tk.END, "\n".join(lines) + "\n")
+        text.see(tk.END)
+        lat.extend(_latency(l) for l in lines)
+
+    def run(name, fn, make_deliver):
+        lat, ticks, state = [], [], {"done": False, "peak": 0}
+        deliver, stop = make_deliver(lat)
+
+        def beat(expected):
+            now = time.perf_counter()
+            ticks.append(now - expected)
+            if not state["done"]:
+                root.after(10, beat, now + 0.010)
+
+        def worker():
+            state["peak"] = fn(children, seconds, rate, deliver)[1]
+            state["done"] = True
+
+        cpu0 = time.process_time()
+        root.after(10, beat, time.perf_counter() + 0.010)
+        threading.Thread(target=worker, daemon=True).start()
+        while not state["done"]:
+            root.update()
+            time.sleep(0.001)
+        stop()
+        root.update()
+        cpu = time.process_time() - cpu0
+        print(f"{name:<16}{cpu:>8.2f}{state['peak']:>9}{len(lat):>8}"
+              f"{_percentile(lat, 0.5):>9.2f}{_percentile(lat, 0.99):>9.2f}"
+              f"{_percentile(ticks, 0.99):>10.2f}")
+
+    def per_line(lat):
+        # The old path: every reader thread hands each line to Tk separately
+        return (lambda line: root.after(0, append, [line], lat)), (lambda: None)
+
+    def batched(lat):
+        # The app's path: a queue drained by one periodic Tk callback
+        q, state = queue.SimpleQueue(), {"job": None}
+
+        def flush():
+            lines = []
+            try:
+                while True:
+                    lines.append(q.get_nowait())
+            except queue.Empty:
+                pass
+            if lines:
+                append(lines, lat)
+            state["job"] = root.after(LOG_FLUSH_MS, flush)
+
+        def stop():
+            root.after_cancel(state["job"])
+            flush()
+            root.after_cancel(state["job"])
+
+        flush()
+        return q.put, stop
+
+    print(f"{'mode':<16}{'cpu s':>8}{'threads':>9}{'lines':>8}{'p50 ms':>9}{'p99 ms':>9}"
+          f"{'tick p99':>10}")
+    run("threads+tk", bench_threads, per_line)
+    run("supervisor+tk", bench_supervisor, batched)
+    root.destroy()
+
+
+def main():
+    args = [a for a in sys.argv[1:] if a != "--tk"]
+    children = int(args[0]) if len(args) > 0 else 32
+    seconds  = float(args[1]) if len(args) > 1 else 5
+    rate     = float(args[2]) if len(args) > 2 else 20
+    print(f"{children} children x {seconds:.0f}s x {rate:.0f} lines/s  (pid {os.getpid()})")
+    if "--tk" in sys.argv:
+        bench_tk(children, seconds, rate)
+        return
+    # "steady" drops the first quarter of lines, i.e. the spawn burst
+    print(f"{'mode':<12}{'cpu s':>8}{'threads':>9}{'lines':>8}{'p50 ms':>9}{'p99 ms':>9}"
+          f"{'p99 steady':>12}")
+    for name, fn in (("threads", bench_threads), ("supervisor", bench_supervisor)):
+        cpu0 = time.process_time()
+        lat, peak = fn(children, seconds, rate)
+        cpu = time.process_time() - cpu0
+        print(f"{name:<12}{cpu:>8.2f}{peak:>9}{len(lat):>8}"
+              f"{_percentile(lat, 0.5):>9.2f}{_percentile(lat, 0.99):>9.2f}"
+              f"{_percentile(lat[len(lat) // 4:], 0.99):>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,7 @@ REM  Output: dist\KG-YT-Downloader.exe
 REM ============================================================
 
 echo [1/5] Installing Python dependencies...
-pip install pyinstaller yt-dlp
+pip install pyinstaller yt-dlp pillow
 if errorlevel 1 (echo ERROR: pip failed & pause & exit /b 1)
 
 echo.
@@ -4,23 +4,64 @@ Bundled via PyInstaller. yt-dlp and ffmpeg are included in the package.
 """
 
 import tkinter as tk
-from tkinter import ttk, filedialog, messagebox
+from tkinter import ttk, filedialog, messagebox, simpledialog
 import threading
+import asyncio
+import locale
+import queue
 import os
 import sys
 import subprocess
+import shutil
+import tempfile
 import webbrowser
 import json
 import re
+import signal
 import sqlite3
+import time
+import base64
+import io
+import urllib.request
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+try:
+    import yt_dlp
+except ImportError:
+    yt_dlp = None
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
 APP_NAME   = "KG-YT Downloader"
 APP_VER    = "2.0.0"
 GITHUB_URL = "https://github.com/ToadOak"
 
 CONFIG_FILE  = os.path.join(os.path.expanduser("~"), ".kg_yt_downloader.json")
 HISTORY_FILE = os.path.join(os.path.expanduser("~"), ".kg_yt_history.db")
+CACHE_DIR    = os.path.join(os.path.expanduser("~"), ".kg_yt_cache")
+COOKIE_FILE  = os.path.join(CACHE_DIR, "cookies.txt")
+THUMB_DIR    = os.path.join(CACHE_DIR, "thumbs")
+THUMB_SIZE   = (64, 36)
+THUMB_LRU    = 256
+CACHE_MAX_MB = 256
+STAGING_DIR  = os.path.join(tempfile.gettempdir(), "kg_yt_staging")
+DISK_MARGIN  = 200 * 1024 * 1024
+STAGING_STALE = 6 * 3600
+SUB_BASELINE = 50
+SUB_CHECK_MS = 10 * 60 * 1000
+LOG_FLUSH_MS = 50
+SAVE_DELAY   = 0.5
+DB_TIMEOUT   = 30
+RATE_RE      = re.compile(r"^\d+(\.\d+)?[KMG]?$", re.I)
+
+# Options captured into each queue item and into named presets
+PRESET_KEYS = ("format", "quality", "embed_thumbnail", "embed_metadata",
+               "playlist_mode", "rate_limit", "concurrency", "last_folder")
 
 # ── Resolve bundled binary / resource paths ───────────────────────────────────
 def _get_base_dir():
@@ -35,6 +76,159 @@ def _bin(name):
 def _resource(name):
     return os.path.join(_get_base_dir(), name)
 
+def _group_kwargs():
+    """Popen kwargs that start a child in its own process group."""
+    if sys.platform == "win32":
+        return {"creationflags": subprocess.CREATE_NO_WINDOW
+                                 | subprocess.CREATE_NEW_PROCESS_GROUP}
+    return {"start_new_session": True}
+
+def kill_process_tree(proc, timeout=5):
+    """Stop a yt-dlp child together with the ffmpeg processes it spawned."""
+    if proc.poll() is not None:
+        return
+    try:
+        if sys.platform == "win32":
+            subprocess.run(["taskkill", "/T", "/F", "/PID", str(proc.pid)],
+                           capture_output=True, creationflags=subprocess.CREATE_NO_WINDOW)
+        else:
+            os.killpg(proc.pid, signal.SIGTERM)
+            try:
+                proc.wait(timeout)
+            except subprocess.TimeoutExpired:
+                os.killpg(proc.pid, signal.SIGKILL)
+    except OSError:
+        pass
+
+# ── Process supervisor ────────────────────────────────────────────────────────
+LINE_SPLIT = re.compile(rb"\r\n|\r|\n")
+
+class ChildProcess:
+    """Popen-like handle (pid, poll, wait, returncode) for a supervised child."""
+
+    def __init__(self, args):
+        self.args       = args
+        self.pid        = None
+        self.returncode = None
+        self._started   = threading.Event()
+        self._done      = threading.Event()
+        self._error     = None
+
+    def poll(self):
+        return self.returncode
+
+    def wait(self, timeout=None):
+        if not self._done.wait(timeout):
+            raise subprocess.TimeoutExpired(self.args, timeout)
+        return self.returncode
+
+class _ChildProtocol(asyncio.SubprocessProtocol):
+    """Splits a child's merged stdout/stderr into lines as chunks arrive."""
+
+    def __init__(self, child, encoding, on_line, on_exit):
+        self.child     = child
+        self.encoding  = encoding
+        self.on_line   = on_line
+        self.on_exit   = on_exit
+        self.transport = None
+        self.buf       = b""
+        self.pending   = 2   # pipe closed + process exited
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def pipe_data_received(self, fd, data):
+        *lines, self.buf = LINE_SPLIT.split(self.buf + data)
+        self._emit(lines)
+
+    def pipe_connection_lost(self, fd, exc):
+        self._emit([self.buf])
+        self.buf = b""
+        self._step()
+
+    def process_exited(self):
+        self._step()
+
+    def _step(self):
+        self.pending -= 1
+        if self.pending:
+            return
+        self.child.returncode = self.transport.get_returncode()
+        self.transport.close()
+        self.child._done.set()
+        if self.on_exit:
+            try:
+                self.on_exit(self.child.returncode)
+            except Exception:
+                pass
+
+    def _emit(self, lines):
+        if not self.on_line:
+            return
+        for raw in lines:
+            line = raw.decode(self.encoding, "replace").rstrip()
+            if line:
+                try:
+                    self.on_line(line)
+                except Exception:
+                    pass
+
+class ProcessSupervisor:
+    """Runs every yt-dlp child on one asyncio loop; on_line/on_exit must stay cheap."""
+
+    def __init__(self):
+        self.loop     = None
+        self.lock     = threading.Lock()
+        self.encoding = locale.getpreferredencoding(False)
+
+    def _ensure_loop(self):
+        with self.lock:
+            if self.loop is None:
+                self.loop = asyncio.new_event_loop()
+                # Before 3.12 the default POSIX watcher spends a thread per child
+                if sys.platform != "win32" and sys.version_info < (3, 12) \
+                        and hasattr(os, "pidfd_open"):
+                    watcher = asyncio.PidfdChildWatcher()
+                    watcher.attach_loop(self.loop)
+                    asyncio.set_child_watcher(watcher)
+                threading.Thread(target=self.loop.run_forever, daemon=True,
+                                 name="process-supervisor").start()
+        return self.loop
+
+    def spawn(self, cmd, on_line=None, on_exit=None):
+        """Start cmd with stderr merged into stdout; return a ChildProcess."""
+        child = ChildProcess(cmd)
+        asyncio.run_coroutine_threadsafe(self._start(child, on_line, on_exit),
+                                         self._ensure_loop())
+        child._started.wait()
+        if child._error is not None:
+            raise child._error
+        return child
+
+    def run(self, cmd, timeout=None):
+        """Run cmd to completion; return (returncode, output lines)."""
+        lines = []
+        child = self.spawn(cmd, on_line=lines.append)
+        try:
+            child.wait(timeout)
+        except subprocess.TimeoutExpired:
+            kill_process_tree(child)
+            raise
+        return child.returncode, lines
+
+    async def _start(self, child, on_line, on_exit):
+        try:
+            transport, _ = await self.loop.subprocess_exec(
+                lambda: _ChildProtocol(child, self.encoding, on_line, on_exit),
+                *child.args, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT, **_group_kwargs())
+            child.pid = transport.get_pid()
+        except Exception as e:
+            child._error = e
+        child._started.set()
+
+SUPERVISOR = ProcessSupervisor()
+
 def _check_bins():
     missing = [_bin(b) for b in ("yt-dlp", "ffmpeg") if not os.path.isfile(_bin(b))]
     if missing:
@@ -51,39 +245,557 @@ def load_config():
         except Exception:
             pass
     return {"last_folder": "", "quality": "Best", "format": "mp4",
-            "embed_thumbnail": True, "embed_metadata": True, "playlist_mode": False}
-
-def save_config(cfg):
+            "embed_thumbnail": True, "embed_metadata": True, "playlist_mode": False,
+            "cache_max_mb": CACHE_MAX_MB, "staging_dir": STAGING_DIR,
+            "schedule_policy": "FIFO", "concurrency": 1,
+            "sub_sync_hours": 0, "sub_auto_download": False,
+            "rate_limit": "", "presets": {}, "library_roots": []}
+
+def _write_config(text):
+    """Write the config via temp file + rename so a crash never leaves it half-written."""
+    tmp = CONFIG_FILE + ".tmp"
     try:
-        with open(CONFIG_FILE, "w") as f:
-            json.dump(cfg, f, indent=2)
+        with open(tmp, "w") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, CONFIG_FILE)
     except Exception:
         pass
 
+class SettingsStore:
+    """The config dict; save() hands it to a writer thread that debounces by SAVE_DELAY."""
+
+    def __init__(self, delay=SAVE_DELAY):
+        self.data    = load_config()
+        self.delay   = delay
+        self.cond    = threading.Condition()
+        self.pending = None
+        self.due     = 0.0
+        self.thread  = None
+        self.version = 0
+        self.written = 0
+        self.io_lock = threading.Lock()
+
+    def save(self):
+        text = json.dumps(self.data, indent=2)
+        with self.cond:
+            self.version += 1
+            self.pending = (self.version, text)
+            self.due = time.monotonic() + self.delay
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._writer, daemon=True,
+                                               name="settings-writer")
+                self.thread.start()
+            self.cond.notify()
+
+    def flush(self):
+        """Write any pending change now and wait for one in flight (used on exit)."""
+        with self.cond:
+            pending, self.pending = self.pending, None
+            target = self.version
+        self._write(pending)
+        # The writer may have taken the last change just before us
+        with self.cond:
+            self.cond.wait_for(lambda: self.written >= target, timeout=5)
+
+    def _write(self, pending):
+        # Never let a slower, older write land on top of a newer one
+        if pending is None:
+            return
+        version, text = pending
+        with self.io_lock:
+            if version > self.written:
+                _write_config(text)
+                with self.cond:
+                    self.written = version
+                    self.cond.notify_all()
+
+    def _writer(self):
+        while True:
+            with self.cond:
+                while self.pending is None:
+                    self.cond.wait()
+                while self.pending is not None and time.monotonic() < self.due:
+                    self.cond.wait(self.due - time.monotonic())
+                pending, self.pending = self.pending, None
+            self._write(pending)
+
+# ── yt-dlp cache ──────────────────────────────────────────────────────────────
+def _cache_args():
+    """Flags that point a yt-dlp child at the shared cache and cookie jar."""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    return ["--cache-dir", CACHE_DIR, "--cookies", COOKIE_FILE]
+
+def prune_cache(max_mb=CACHE_MAX_MB):
+    """Evict least-recently-used cache files until the cache fits in max_mb."""
+    files, total = [], 0
+    for root, _, names in os.walk(CACHE_DIR):
+        for name in names:
+            path = os.path.join(root, name)
+            if path == COOKIE_FILE:
+                continue
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            files.append((max(st.st_atime, st.st_mtime), st.st_size, path))
+            total += st.st_size
+    limit = max_mb * 1024 * 1024
+    removed = 0
+    for _, size, path in sorted(files):
+        if total <= limit:
+            break
+        try:
+            os.remove(path)
+            total -= size
+            removed += 1
+        except OSError:
+            pass
+    return removed
+
+def _version_key(version):
+    return tuple(int(n) for n in re.findall(r"\d+", version or ""))
+
+class YtdlEngine:
+    """Pooled in-process yt-dlp for metadata, or the bundled binary when that is newer."""
+
+    def __init__(self):
+        self.lock      = threading.Lock()
+        self.idle      = []
+        self.inprocess = None
+        self.timings   = []
+
+    def _use_module(self):
+        with self.lock:
+            if self.inprocess is None:
+                self.inprocess = False
+                if yt_dlp is not None:
+                    try:
+                        rc, lines = SUPERVISOR.run([_bin("yt-dlp"), "--version"], timeout=30)
+                        binary = lines[-1] if rc == 0 and lines else ""
+                        self.inprocess = (_version_key(yt_dlp.version.__version__)
+                                          >= _version_key(binary))
+                    except Exception:
+                        pass
+            return self.inprocess
+
+    def _new(self):
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        return yt_dlp.YoutubeDL({
+            "quiet": True, "no_warnings": True, "noplaylist": True,
+            "skip_download": True, "cachedir": CACHE_DIR,
+            "cookiefile": COOKIE_FILE,
+        })
+
+    def _acquire(self):
+        with self.lock:
+            if self.idle:
+                return self.idle.pop()
+        return self._new()
+
+    def _release(self, ydl):
+        with self.lock:
+            self.idle.append(ydl)
+
+    def _resolve(self, ydl, url):
+        # process=False leaves url/url_transparent redirects (e.g. a watch URL
+        # with &list= under noplaylist) for the caller to follow
+        info = ydl.extract_info(url, download=False, process=False)
+        for _ in range(3):
+            if not info or info.get("_type") not in ("url", "url_transparent"):
+                break
+            info = ydl.extract_info(info["url"], download=False, process=False)
+        return info
+
+    def extract(self, url):
+        """Return (info, seconds) for url without downloading it."""
+        t0 = time.perf_counter()
+        if self._use_module():
+            ydl = self._acquire()
+            try:
+                info = self._resolve(ydl, url)
+            finally:
+                self._release(ydl)
+        else:
+            rc, lines = SUPERVISOR.run(
+                [_bin("yt-dlp"), *_cache_args(), "--no-playlist", "--dump-json",
+                 "--no-download", url], timeout=30)
+            if rc != 0:
+                raise RuntimeError(friendly_error("\n".join(lines)))
+            info = json.loads(next(l for l in lines if l.startswith("{")))
+        elapsed = time.perf_counter() - t0
+        self.timings.append(elapsed)
+        return info or {}, elapsed
+
+    def list_entries(self, url, stop=None):
+        """Flat-enumerate a channel or playlist up to the first entry where stop(e) holds."""
+        title, found = "", []
+        if self._use_module():
+            # Own instance, not a pooled one: a full enumeration can take
+            # minutes and the pool is meant for quick per-item lookups
+            with self._new() as ydl:
+                info  = self._resolve(ydl, url)
+                title = info.get("title", "")
+                for e in info.get("entries") or []:
+                    if stop and stop(e):
+                        break
+                    found.append(e)
+            return title, found
+
+        state = {"title": "", "stopped": False, "child": None}
+
+        def on_line(line):
+            parts = line.split("\t", 3)
+            if state["stopped"] or len(parts) < 4:
+                return
+            state["title"] = parts[0]
+            e = {"id": parts[1], "title": parts[3],
+                 "upload_date": None if parts[2] == "NA" else parts[2]}
+            if stop and stop(e):
+                state["stopped"] = True
+                if state["child"] is not None:
+                    # Not on the loop thread: kill_process_tree waits for the exit
+                    threading.Thread(target=kill_process_tree, args=(state["child"],),
+                                     daemon=True).start()
+                return
+            found.append(e)
+
+        child = state["child"] = SUPERVISOR.spawn(
+            [_bin("yt-dlp"), *_cache_args(), "--flat-playlist", "--no-warnings",
+             "--print", "%(playlist_title)s\t%(id)s\t%(upload_date)s\t%(title)s", url],
+            on_line=on_line)
+        if state["stopped"]:
+            kill_process_tree(child)
+        child.wait()
+        return state["title"], found
+
+    def stats(self):
+        """Return (first, warm average) extraction latency in seconds."""
+        if not self.timings:
+            return None, None
+        warm = self.timings[1:]
+        return self.timings[0], (sum(warm) / len(warm) if warm else None)
+
+    def close(self):
+        """Drop pooled instances; the module/binary choice is re-made on next use."""
+        with self.lock:
+            for ydl in self.idle:
+                try:
+                    ydl.close()
+                except Exception:
+                    pass
+            self.idle, self.inprocess = [], None
+
+# ── Thumbnails ────────────────────────────────────────────────────────────────
+VIDEO_ID_RE = re.compile(r"(?:[?&]v=|youtu\.be/|/shorts/|/embed/)([\w-]{11})")
+
+def video_id(url):
+    m = VIDEO_ID_RE.search(url or "")
+    return m.group(1) if m else None
+
+def _write_cached(path, data):
+    # Unique temp name: the preview pool and a download may fetch one ID at once
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    try:
+        os.replace(tmp, path)
+    except OSError:
+        os.remove(tmp)
+        if not os.path.exists(path):
+            raise
+
+def fetch_thumbnail(vid):
+    """Return the path of vid's cached full-size JPEG, downloading it once."""
+    path = os.path.join(THUMB_DIR, vid + ".jpg")
+    if os.path.exists(path):
+        return path
+    os.makedirs(THUMB_DIR, exist_ok=True)
+    for name in ("maxresdefault.jpg", "hqdefault.jpg"):
+        try:
+            req = urllib.request.Request(f"https://i.ytimg.com/vi/{vid}/{name}",
+                                         headers={"User-Agent": "Mozilla/5.0"})
+            with urllib.request.urlopen(req, timeout=10) as r:
+                data = r.read()
+        except Exception:
+            continue
+        if data[:2] != b"\xff\xd8":
+            continue
+        _write_cached(path, data)
+        return path
+    return None
+
+def thumbnail_preview(vid):
+    """Return PNG bytes of vid's thumbnail scaled to THUMB_SIZE (cached), or None."""
+    small = os.path.join(THUMB_DIR, vid + "_s.png")
+    if os.path.exists(small):
+        with open(small, "rb") as f:
+            return f.read()
+    if Image is None:
+        return None
+    src = fetch_thumbnail(vid)
+    if not src:
+        return None
+    with Image.open(src) as im:
+        im = im.convert("RGB")
+        im.thumbnail(THUMB_SIZE)
+        buf = io.BytesIO()
+        im.save(buf, "PNG")
+    data = buf.getvalue()
+    _write_cached(small, data)
+    return data
+
+def embed_cover(audio_path, cover):
+    """Attach cover as front-cover art to an MP3 in place."""
+    base, ext = os.path.splitext(audio_path)
+    tmp = base + ".cover" + ext
+    rc, lines = SUPERVISOR.run([
+        _bin("ffmpeg"), "-y", "-loglevel", "error", "-i", audio_path, "-i", cover,
+        "-map", "0:a", "-map", "1", "-c", "copy", "-id3v2_version", "3",
+        "-metadata:s:v", "title=Album cover", "-metadata:s:v", "comment=Cover (front)",
+        tmp])
+    if rc != 0:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise RuntimeError("Embedding thumbnail failed: " + " ".join(lines[-3:]))
+    os.replace(tmp, audio_path)
+
+class ThumbnailCache:
+    """Bounded LRU of Tk thumbnail images keyed by video ID."""
+
+    def __init__(self, root, size=THUMB_LRU):
+        self.root     = root
+        self.size     = size
+        self.images   = OrderedDict()
+        self.inflight = {}
+        self.pool     = ThreadPoolExecutor(max_workers=4, thread_name_prefix="thumb")
+
+    def get(self, vid, callback):
+        if not vid:
+            return
+        img = self.images.get(vid)
+        if img is not None:
+            self.images.move_to_end(vid)
+            callback(img)
+            return
+        if vid in self.inflight:
+            self.inflight[vid].append(callback)
+            return
+        self.inflight[vid] = [callback]
+        fut = self.pool.submit(thumbnail_preview, vid)
+        fut.add_done_callback(lambda f: self.root.after(0, self._ready, vid, f))
+
+    def _ready(self, vid, fut):
+        callbacks = self.inflight.pop(vid, [])
+        try:
+            data = fut.result()
+        except Exception:
+            data = None
+        if not data:
+            return
+        img = tk.PhotoImage(data=base64.b64encode(data))
+        self.images[vid] = img
+        while len(self.images) > self.size:
+            self.images.popitem(last=False)
+        for cb in callbacks:
+            try:
+                cb(img)
+            except tk.TclError:
+                pass
+
+# ── Staging / disk space ──────────────────────────────────────────────────────
+def _fmt_bytes(n):
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(n) < 1024:
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n:.1f} TB"
+
+def estimate_size(info, fmt, quality):
+    """Best-effort byte estimate for the chosen format, or None if unknown."""
+    if not info:
+        return None
+    duration = info.get("duration") or 0
+    formats  = info.get("formats") or []
+
+    def size(f):
+        return (f.get("filesize") or f.get("filesize_approx")
+                or (f.get("tbr") or 0) * 125 * duration)
+
+    audio = max((size(f) for f in formats
+                 if f.get("vcodec") == "none" and f.get("acodec") not in (None, "none")),
+                default=0)
+    if fmt == "mp3":
+        # Source audio plus the ~245 kbps VBR mp3 produced by --audio-quality 0
+        total = audio + 245 * 125 * duration
+    else:
+        limit = int(quality[:-1]) if quality.endswith("p") else None
+        video = max((size(f) for f in formats
+                     if f.get("vcodec") not in (None, "none")
+                     and (limit is None or (f.get("height") or 0) <= limit)),
+                    default=0)
+        total = video + audio
+    return int(total) or None
+
+class DiskReservations:
+    """Bytes promised to running jobs, per volume."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.held = {}
+
+    def reserve(self, needs):
+        """Book [(path, nbytes), ...]; return a token or raise OSError."""
+        with self.lock:
+            want, free = {}, {}
+            for path, n in needs:
+                dev = os.stat(path).st_dev
+                want[dev] = want.get(dev, 0) + n
+                free[dev] = shutil.disk_usage(path).free
+            for dev, n in want.items():
+                avail = free[dev] - self.held.get(dev, 0) - DISK_MARGIN
+                if n > avail:
+                    raise OSError(f"Not enough disk space: need {_fmt_bytes(n)}, "
+                                  f"{_fmt_bytes(max(avail, 0))} available")
+            for dev, n in want.items():
+                self.held[dev] = self.held.get(dev, 0) + n
+            return want
+
+    def release(self, token):
+        with self.lock:
+            for dev, n in token.items():
+                self.held[dev] = max(0, self.held.get(dev, 0) - n)
+
+DISK = DiskReservations()
+
+def finalize_staged(job_dir, folder, main_path=""):
+    """Move finished files from job_dir into folder; return main_path's new location."""
+    for root, _, names in os.walk(job_dir):
+        for name in names:
+            if name.endswith((".part", ".ytdl", ".temp")) or ".part-Frag" in name:
+                continue
+            src = os.path.join(root, name)
+            dst = os.path.join(folder, os.path.relpath(src, job_dir))
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            tmp = os.path.join(os.path.dirname(dst), f".{os.path.basename(dst)}.kgpart")
+            shutil.move(src, tmp)
+            os.replace(tmp, dst)
+    if not main_path:
+        return ""
+    return os.path.join(folder, os.path.relpath(main_path, job_dir))
+
+def sweep_staging(staging, max_age=STAGING_STALE):
+    """Remove job dirs left behind by a crash or by items still paused at exit."""
+    removed, now = 0, time.time()
+    try:
+        with os.scandir(staging) as it:
+            for e in it:
+                if e.name.startswith("job-") and e.is_dir() \
+                        and now - e.stat().st_mtime > max_age:
+                    shutil.rmtree(e.path, ignore_errors=True)
+                    removed += 1
+    except OSError:
+        pass
+    return removed
+
 # ── History DB ────────────────────────────────────────────────────────────────
 def init_db():
-    con = sqlite3.connect(HISTORY_FILE)
+    con = sqlite3.connect(HISTORY_FILE, timeout=DB_TIMEOUT)
     con.execute("""CREATE TABLE IF NOT EXISTS history (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         title TEXT, url TEXT, fmt TEXT,
         save_path TEXT, date TEXT, status TEXT
     )""")
+    con.execute("""CREATE TABLE IF NOT EXISTS subscriptions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        url TEXT UNIQUE, name TEXT, fmt TEXT, quality TEXT,
+        last_upload_date TEXT, last_sync TEXT, last_new INTEGER DEFAULT 0
+    )""")
+    con.execute("""CREATE TABLE IF NOT EXISTS subscription_seen (
+        sub_id INTEGER, video_id TEXT,
+        PRIMARY KEY (sub_id, video_id)
+    )""")
+    # pending: queued by a sync but not downloaded yet, re-queued next session
+    cols = {r[1] for r in con.execute("PRAGMA table_info(subscription_seen)")}
+    for col, kind in (("pending", "INTEGER DEFAULT 0"), ("title", "TEXT")):
+        if col not in cols:
+            con.execute(f"ALTER TABLE subscription_seen ADD COLUMN {col} {kind}")
+    cols = {r[1] for r in con.execute("PRAGMA table_info(history)")}
+    for col, kind in (("bytes", "INTEGER"), ("seconds", "REAL"), ("reason", "TEXT")):
+        if col not in cols:
+            con.execute(f"ALTER TABLE history ADD COLUMN {col} {kind}")
+    # Rollups kept current by add_history so stats never scan history
+    con.execute("""CREATE TABLE IF NOT EXISTS history_daily (
+        day TEXT, fmt TEXT, status TEXT,
+        count INTEGER, bytes INTEGER, seconds REAL,
+        PRIMARY KEY (day, fmt, status)
+    )""")
+    con.execute("""CREATE TABLE IF NOT EXISTS history_failures (
+        day TEXT, reason TEXT, count INTEGER,
+        PRIMARY KEY (day, reason)
+    )""")
+    if not con.execute("SELECT 1 FROM history_daily LIMIT 1").fetchone():
+        _rebuild_rollups(con)
+    con.execute("""CREATE TABLE IF NOT EXISTS library (
+        path TEXT PRIMARY KEY, folder TEXT, video_id TEXT, ext TEXT,
+        height INTEGER, size INTEGER, mtime REAL, inode INTEGER
+    )""")
+    con.execute("CREATE INDEX IF NOT EXISTS library_video ON library (video_id, height)")
+    con.execute("CREATE INDEX IF NOT EXISTS library_folder ON library (folder)")
+    con.execute("""CREATE TABLE IF NOT EXISTS library_dirs (
+        path TEXT PRIMARY KEY, parent TEXT, mtime REAL
+    )""")
+    con.execute("CREATE INDEX IF NOT EXISTS library_dirs_parent ON library_dirs (parent)")
     con.commit()
     return con
 
-def add_history(title, url, fmt, save_path, status):
+def _rebuild_rollups(con):
+    """One-off backfill of the rollup tables from existing history rows."""
+    con.execute("DELETE FROM history_daily")
+    con.execute("DELETE FROM history_failures")
+    con.execute("""INSERT INTO history_daily (day,fmt,status,count,bytes,seconds)
+        SELECT substr(date,1,10), fmt, status, COUNT(*),
+               COALESCE(SUM(bytes),0), COALESCE(SUM(seconds),0)
+        FROM history GROUP BY 1, 2, 3""")
+    con.execute("""INSERT INTO history_failures (day,reason,count)
+        SELECT substr(date,1,10), COALESCE(reason,'Unknown error'), COUNT(*)
+        FROM history WHERE status != 'success' GROUP BY 1, 2""")
+
+def failure_reason(msg):
+    """Reduce a yt-dlp error line to a groupable reason."""
+    msg = (msg or "").strip()
+    if msg.startswith("ERROR:"):
+        msg = friendly_error(msg[6:].strip())
+    msg = re.sub(r"^\[[\w:]+\] [\w-]+: ", "", msg)
+    return msg.splitlines()[0][:120] if msg else "Unknown error"
+
+def add_history(title, url, fmt, save_path, status, bytes_=None, seconds=None, reason=None):
     try:
-        con = sqlite3.connect(HISTORY_FILE)
-        con.execute("INSERT INTO history (title,url,fmt,save_path,date,status) VALUES (?,?,?,?,?,?)",
-                    (title, url, fmt, save_path, datetime.now().strftime("%Y-%m-%d %H:%M"), status))
-        con.commit()
+        date = datetime.now().strftime("%Y-%m-%d %H:%M")
+        con = sqlite3.connect(HISTORY_FILE, timeout=DB_TIMEOUT)
+        with con:
+            con.execute("INSERT INTO history (title,url,fmt,save_path,date,status,bytes,seconds,reason)"
+                        " VALUES (?,?,?,?,?,?,?,?,?)",
+                        (title, url, fmt, save_path, date, status, bytes_, seconds, reason))
+            con.execute("""INSERT INTO history_daily (day,fmt,status,count,bytes,seconds)
+                VALUES (?,?,?,1,?,?)
+                ON CONFLICT (day,fmt,status) DO UPDATE SET
+                    count = count + 1,
+                    bytes = bytes + excluded.bytes,
+                    seconds = seconds + excluded.seconds""",
+                (date[:10], fmt, status, bytes_ or 0, seconds or 0))
+            if status != "success":
+                con.execute("""INSERT INTO history_failures (day,reason,count) VALUES (?,?,1)
+                    ON CONFLICT (day,reason) DO UPDATE SET count = count + 1""",
+                    (date[:10], reason or "Unknown error"))
         con.close()
     except Exception:
         pass
 
 def get_history(limit=200):
     try:
-        con = sqlite3.connect(HISTORY_FILE)
+        con = sqlite3.connect(HISTORY_FILE, timeout=DB_TIMEOUT)
         rows = con.execute(
             "SELECT title,url,fmt,save_path,date,status FROM history ORDER BY id DESC LIMIT ?",
             (limit,)
@@ -95,13 +807,360 @@ def get_history(limit=200):
 
 def clear_history():
     try:
-        con = sqlite3.connect(HISTORY_FILE)
+        con = sqlite3.connect(HISTORY_FILE, timeout=DB_TIMEOUT)
         con.execute("DELETE FROM history")
+        con.execute("DELETE FROM history_daily")
+        con.execute("DELETE FROM history_failures")
         con.commit()
         con.close()
     except Exception:
         pass
 
+def get_daily_stats(since):
+    """Per-day (day, total, ok, bytes, seconds) from the rollups, oldest first."""
+    try:
+        con = sqlite3.connect(HISTORY_FILE, timeout=DB_TIMEOUT)
+        rows = con.execute("""SELECT day, SUM(count),
+                   SUM(CASE WHEN status='success' THEN count ELSE 0 END),
+                   SUM(CASE WHEN status='success' THEN bytes ELSE 0 END),
+                   SUM(CASE WHEN status='success' THEN seconds ELSE 0 END)
+            FROM history_daily WHERE day >= ? GROUP BY day ORDER BY day""",
+            (since,)).fetchall()
+        con.close()
+        return rows
+    except Exception:
+        return []
+
+def get_format_stats(since):
+    try:
+        con = sqlite3.connect(HISTORY_FILE, timeout=DB_TIMEOUT)
+        rows = con.execute("""SELECT fmt, SUM(count),
+                   SUM(CASE WHEN status='success' THEN count ELSE 0 END)
+            FROM history_daily WHERE day >= ? GROUP BY fmt ORDER BY 2 DESC""",
+            (since,)).fetchall()
+        con.close()
+        return rows
+    except Exception:
+        return []
+
+def get_failure_reasons(since, limit=10):
+    try:
+        con = sqlite3.connect(HISTORY_FILE, timeout=DB_TIMEOUT)
+        rows = con.execute("""SELECT reason, SUM(count) FROM history_failures
+            WHERE day >= ? GROUP BY reason ORDER BY 2 DESC LIMIT ?""",
+            (since, limit)).fetchall()
+        con.close()
+        return rows
+    except Exception:
+        return []
+
+# ── Library index ─────────────────────────────────────────────────────────────
+MEDIA_EXTS   = (".mp4", ".mkv", ".webm", ".m4a", ".mp3", ".opus")
+LIBRARY_LOCK = threading.Lock()
+LIBRARY_BATCH = 20
+FILENAME_ID_RE = re.compile(r"\[([\w-]{11})\]")
+
+def probe_media(path):
+    """Return (video_id, height) for a media file; height is 0 for audio."""
+    try:
+        _, lines = SUPERVISOR.run([_bin("ffmpeg"), "-hide_banner", "-i", path], timeout=30)
+    except Exception:
+        lines = []
+    vid, height = None, 0
+    for line in lines:
+        m = re.match(r"\s*(?:comment|purl)\s*:\s*(.+)", line, re.I)
+        if m and not vid:
+            vid = video_id(m.group(1))
+        m = re.search(r"Video: .*?\b(\d{2,5})x(\d{2,5})\b", line)
+        if m and not height and "attached pic" not in line:
+            height = int(m.group(2))
+    if not vid:
+        m = FILENAME_ID_RE.search(os.path.basename(path))
+        vid = m.group(1) if m else None
+    return vid, height
+
+def _under(path, root):
+    return path == root or path.startswith(root.rstrip(os.sep) + os.sep)
+
+def _drop_tree(con, d):
+    prefix = d.rstrip(os.sep) + os.sep
+    n = con.execute("DELETE FROM library WHERE folder=? OR substr(folder,1,?)=?",
+                    (d, len(prefix), prefix)).rowcount
+    con.execute("DELETE FROM library_dirs WHERE path=? OR substr(path,1,?)=?",
+                (d, len(prefix), prefix))
+    return n
+
+def scan_library(roots, probe=probe_media):
+    """Bring the library index up to date with the files under roots; return counts."""
+    stats = {"added": 0, "moved": 0, "removed": 0}
+    roots = [os.path.abspath(r) for r in roots if r and os.path.isdir(r)]
+    with LIBRARY_LOCK:
+        con = sqlite3.connect(HISTORY_FILE, timeout=DB_TIMEOUT)
+        known = dict(con.execute("SELECT path, mtime FROM library_dirs"))
+        gone, new, dirs, dropped, visited = {}, [], [], [], set()
+        stack = list(roots)
+        while stack:
+            d = stack.pop()
+            if d in visited:
+                continue
+            visited.add(d)
+            try:
+                mtime = os.stat(d).st_mtime
+            except OSError:
+                continue
+            children = [r[0] for r in con.execute(
+                "SELECT path FROM library_dirs WHERE parent=?", (d,))]
+            # Unchanged mtime means the same entries: only visit known subdirs
+            if known.get(d) == mtime:
+                stack.extend(children)
+                continue
+
+            rows = {r[0]: r[1:] for r in con.execute(
+                "SELECT path, size, mtime, inode, video_id, height FROM library WHERE folder=?",
+                (d,))}
+            present, subdirs = set(), set()
+            try:
+                with os.scandir(d) as it:
+                    for e in it:
+                        if e.is_dir(follow_symlinks=False):
+                            subdirs.add(e.path)
+                        elif e.name.lower().endswith(MEDIA_EXTS) and not e.name.startswith("."):
+                            st = e.stat()
+                            present.add(e.path)
+                            old = rows.get(e.path)
+                            if not old or old[0] != st.st_size or old[1] != st.st_mtime:
+                                new.append((e.path, d, st))
+            except OSError:
+                continue
+            for path, row in rows.items():
+                if path not in present:
+                    gone[path] = row
+            dropped.extend(c for c in children if c not in subdirs)
+            stack.extend(subdirs)
+            dirs.append((d, os.path.dirname(d), mtime))
+
+        # Rename detection works across directories, so match after the walk
+        by_inode = {(row[2], row[0]): path for path, row in gone.items() if row[2]}
+        rows, moved, to_probe, waiting = [], [], [], {}
+        for path, folder, st in new:
+            try:
+                inode = os.stat(path).st_ino   # scandir leaves st_ino empty on Windows
+            except OSError:
+                continue
+            old = by_inode.pop((inode, st.st_size), None)
+            if old is None:
+                to_probe.append((path, folder, st, inode))
+                waiting[folder] = waiting.get(folder, 0) + 1
+                continue
+            vid, height = gone.pop(old)[3:5]
+            moved.append((old,))
+            stats["moved"] += 1
+            rows.append((path, folder, vid, os.path.splitext(path)[1][1:].lower(),
+                         height, st.st_size, st.st_mtime, inode))
+
+        # Renames and removals need no probing, so they go in first;
+        # directories still waiting on probes keep their old mtime for now
+        dropped.extend(d for d in known if not any(_under(d, r) for r in roots))
+        dir_rows = {d[0]: d for d in dirs}
+        with con:
+            for d in dropped:
+                stats["removed"] += _drop_tree(con, d)
+            con.executemany("DELETE FROM library WHERE path=?", moved)
+            con.executemany("DELETE FROM library WHERE path=?", [(p,) for p in gone])
+            con.executemany("INSERT OR REPLACE INTO library VALUES (?,?,?,?,?,?,?,?)", rows)
+            con.executemany("INSERT OR REPLACE INTO library_dirs VALUES (?,?,?)",
+                            [row for d, row in dir_rows.items() if d not in waiting])
+        stats["removed"] += len(gone)
+
+        rows, ready = [], []
+        for i, (path, folder, st, inode) in enumerate(to_probe, 1):
+            vid, height = probe(path)
+            stats["added"] += 1
+            rows.append((path, folder, vid, os.path.splitext(path)[1][1:].lower(),
+                         height, st.st_size, st.st_mtime, inode))
+            waiting[folder] -= 1
+            if not waiting[folder]:
+                ready.append(dir_rows[folder])
+            if len(rows) >= LIBRARY_BATCH or i == len(to_probe):
+                with con:
+                    con.executemany("INSERT OR REPLACE INTO library VALUES (?,?,?,?,?,?,?,?)",
+                                    rows)
+                    con.executemany("INSERT OR REPLACE INTO library_dirs VALUES (?,?,?)", ready)
+                rows, ready = [], []
+        con.close()
+    return stats
+
+def index_file(path, vid=None):
+    """Add a just-downloaded file to the library without waiting for a scan."""
+    try:
+        st = os.stat(path)
+        probed, height = probe_media(path)
+        con = sqlite3.connect(HISTORY_FILE, timeout=DB_TIMEOUT)
+        con.execute("INSERT OR REPLACE INTO library VALUES (?,?,?,?,?,?,?,?)",
+                    (os.path.abspath(path), os.path.dirname(os.path.abspath(path)),
+                     vid or probed, os.path.splitext(path)[1][1:].lower(),
+                     height, st.st_size, st.st_mtime, st.st_ino))
+        con.commit()
+        con.close()
+    except Exception:
+        pass
+
+def find_in_library(vid, fmt="mp4", min_height=0):
+    """Path of an existing copy of vid in the wanted format, or None."""
+    if not vid:
+        return None
+    try:
+        con = sqlite3.connect(HISTORY_FILE, timeout=DB_TIMEOUT)
+        if fmt == "mp3":
+            rows = con.execute("SELECT path FROM library WHERE video_id=? AND ext='mp3'",
+                               (vid,)).fetchall()
+        else:
+            rows = con.execute("SELECT path FROM library WHERE video_id=? AND height>=? "
+                               "AND height>0 ORDER BY height DESC",
+                               (vid, max(min_height, 1))).fetchall()
+        con.close()
+    except Exception:
+        return None
+    return next((r[0] for r in rows if os.path.exists(r[0])), None)
+
+def reconcile_history():
+    """Point history rows whose file has moved at its library path; return (fixed, missing)."""
+    missing = 0
+    con = sqlite3.connect(HISTORY_FILE, timeout=DB_TIMEOUT)
+    stale = con.execute("""SELECT h.id, h.url, h.fmt FROM history h
+        LEFT JOIN library l ON l.path = h.save_path
+        WHERE h.status='success' AND h.save_path != '' AND l.path IS NULL""").fetchall()
+    updates = []
+    for hid, url, fmt in stale:
+        path = find_in_library(video_id(url), fmt)
+        if path:
+            updates.append((path, hid))
+        else:
+            missing += 1
+    with con:
+        con.executemany("UPDATE history SET save_path=? WHERE id=?", updates)
+    con.close()
+    return len(updates), missing
+
+# ── Subscriptions ─────────────────────────────────────────────────────────────
+SUB_RE = re.compile(
+    r"^(https?://)?(www\.)?youtube\.com/(@[\w.-]+|channel/[\w-]+|c/[\w.-]+|user/[\w.-]+"
+    r"|playlist\?list=[\w-]+|watch\?.*list=[\w-]+)", re.I
+)
+SUB_COLS = ("id", "url", "name", "fmt", "quality", "last_upload_date", "last_sync", "last_new")
+
+def normalize_sub_url(url):
+    """Return the canonical channel-videos or playlist URL, or None."""
+    url = url.strip()
+    m = SUB_RE.match(url)
+    if not m:
+        return None
+    lst = re.search(r"[?&]list=([\w-]+)", url)
+    if lst:
+        return f"https://www.youtube.com/playlist?list={lst.group(1)}"
+    return f"https://www.youtube.com/{m.group(3)}/videos"
+
+def add_subscription(url, fmt, quality):
+    try:
+        con = sqlite3.connect(HISTORY_FILE, timeout=DB_TIMEOUT)
+        con.execute("INSERT OR IGNORE INTO subscriptions (url,name,fmt,quality) VALUES (?,?,?,?)",
+                    (url, url, fmt, quality))
+        con.commit()
+        con.close()
+    except Exception:
+        pass
+
+def get_subscriptions():
+    try:
+        con = sqlite3.connect(HISTORY_FILE, timeout=DB_TIMEOUT)
+        rows = con.execute(f"SELECT {','.join(SUB_COLS)} FROM subscriptions ORDER BY name").fetchall()
+        con.close()
+        return [dict(zip(SUB_COLS, r)) for r in rows]
+    except Exception:
+        return []
+
+def remove_subscription(sub_id):
+    try:
+        con = sqlite3.connect(HISTORY_FILE, timeout=DB_TIMEOUT)
+        con.execute("DELETE FROM subscriptions WHERE id=?", (sub_id,))
+        con.execute("DELETE FROM subscription_seen WHERE sub_id=?", (sub_id,))
+        con.commit()
+        con.close()
+    except Exception:
+        pass
+
+def get_seen_ids(sub_id):
+    con = sqlite3.connect(HISTORY_FILE, timeout=DB_TIMEOUT)
+    ids = {r[0] for r in con.execute(
+        "SELECT video_id FROM subscription_seen WHERE sub_id=?", (sub_id,))}
+    con.close()
+    return ids
+
+def record_sync(sub_id, name, entries, last_upload_date, new_count, pending=True):
+    """Mark entries seen; unless pending is False they stay queued until downloaded."""
+    con = sqlite3.connect(HISTORY_FILE, timeout=DB_TIMEOUT)
+    con.executemany("INSERT OR IGNORE INTO subscription_seen (sub_id,video_id,pending,title)"
+                    " VALUES (?,?,?,?)",
+                    [(sub_id, e["id"], int(pending), e.get("title")) for e in entries])
+    con.execute("UPDATE subscriptions SET name=COALESCE(NULLIF(?,''),name), last_upload_date=?,"
+                " last_sync=?, last_new=? WHERE id=?",
+                (name, last_upload_date, datetime.now().strftime("%Y-%m-%d %H:%M"),
+                 new_count, sub_id))
+    con.commit()
+    con.close()
+
+def get_pending_items():
+    """Subscription videos found by a sync but not downloaded yet, oldest first."""
+    try:
+        con = sqlite3.connect(HISTORY_FILE, timeout=DB_TIMEOUT)
+        rows = con.execute("""SELECT s.url, s.fmt, s.quality, p.video_id, p.title
+            FROM subscription_seen p JOIN subscriptions s ON s.id = p.sub_id
+            WHERE p.pending=1 ORDER BY p.rowid""").fetchall()
+        con.close()
+        return rows
+    except Exception:
+        return []
+
+def settle_pending(vid):
+    """Stop re-queueing vid: it was downloaded or the user dropped it."""
+    if not vid:
+        return
+    try:
+        con = sqlite3.connect(HISTORY_FILE, timeout=DB_TIMEOUT)
+        con.execute("UPDATE subscription_seen SET pending=0 WHERE video_id=? AND pending=1",
+                    (vid,))
+        con.commit()
+        con.close()
+    except Exception:
+        pass
+
+def sync_subscription(engine, sub):
+    """Return entries new since sub's last sync and record them as pending."""
+    seen      = get_seen_ids(sub["id"])
+    watermark = sub["last_upload_date"]
+    playlist  = "list=" in sub["url"]
+    count     = [0]
+
+    # Channel tabs list newest first, so stop at the first known ID or
+    # older upload; playlists may append anywhere and are read in full
+    def stop(e):
+        count[0] += 1
+        if playlist:
+            return False
+        if not seen:
+            return count[0] > SUB_BASELINE
+        date = e.get("upload_date")
+        return e.get("id") in seen or bool(watermark and date and date < watermark)
+
+    name, entries = engine.list_entries(sub["url"], stop=stop)
+    new   = [e for e in entries if e.get("id") and e["id"] not in seen]
+    dates = [e["upload_date"] for e in new if e.get("upload_date")]
+    first = not seen
+    record_sync(sub["id"], name, new[::-1],
+                max(dates + [watermark or ""]) or None, 0 if first else len(new),
+                pending=not first)
+    return [] if first else new
+
 # ── Theme ─────────────────────────────────────────────────────────────────────
 T = {
     "bg":              "#f5f5f5",
@@ -146,6 +1205,48 @@ YT_RE = re.compile(
 def is_valid_yt_url(url):
     return bool(YT_RE.match(url.strip()))
 
+# ── Scheduling policies ───────────────────────────────────────────────────────
+# Each policy gets the pending entries in queue order plus a dict it may use to
+# remember state between calls, and returns the entry the next free worker runs.
+def _job_length(entry):
+    return (entry.get("info") or {}).get("duration") or float("inf")
+
+def _job_source(entry):
+    if entry.get("source"):
+        return entry["source"]
+    m = re.search(r"[?&]list=([\w-]+)", entry["url"])
+    if m:
+        return m.group(1)
+    info = entry.get("info") or {}
+    return info.get("channel_id") or info.get("uploader_id") or entry["url"]
+
+def pick_fifo(pending, state):
+    return pending[0]
+
+def pick_priority(pending, state):
+    return max(pending, key=lambda q: q.get("priority", 0))
+
+def pick_shortest(pending, state):
+    return min(pending, key=_job_length)
+
+def pick_round_robin(pending, state):
+    sources = []
+    for q in pending:
+        src = _job_source(q)
+        if src not in sources:
+            sources.append(src)
+    served = state.get("rr_served", [])
+    src = min(sources, key=lambda s: served.index(s) if s in served else -1)
+    state["rr_served"] = [s for s in served if s != src] + [src]
+    return next(q for q in pending if _job_source(q) == src)
+
+SCHEDULE_POLICIES = {
+    "FIFO":           pick_fifo,
+    "Priority":       pick_priority,
+    "Shortest first": pick_shortest,
+    "Round-robin":    pick_round_robin,
+}
+
 def friendly_error(stderr):
     if "Private video" in stderr:
         return "This video is private and cannot be downloaded."
@@ -195,7 +1296,8 @@ class HistoryWindow(tk.Toplevel):
     def __init__(self, parent):
         super().__init__(parent)
         self.title("Download History")
-        self.geometry("700x400")
+        self.geometry("780x440")
+        self.thumbs = parent.thumbs
         self.configure(bg=T["bg"])
         self.transient(parent)
         _set_icon(self)
@@ -208,6 +1310,16 @@ class HistoryWindow(tk.Toplevel):
                   bg=T["muted_btn_bg"], fg=T["muted_btn_fg"], relief="flat",
                   cursor="hand2", padx=8, pady=3,
                   command=self._clear).pack(side="right")
+        tk.Button(top, text="📊 Stats", font=("Helvetica", 9),
+                  bg=T["muted_btn_bg"], fg=T["muted_btn_fg"], relief="flat",
+                  cursor="hand2", padx=8, pady=3,
+                  command=lambda: StatsWindow(self)).pack(side="right", padx=(0, 6))
+        tk.Button(top, text="⟳ Rescan Library", font=("Helvetica", 9),
+                  bg=T["muted_btn_bg"], fg=T["muted_btn_fg"], relief="flat",
+                  cursor="hand2", padx=8, pady=3,
+                  command=lambda: parent._scan_library(
+                      on_done=lambda: self.winfo_exists() and self._load())
+                  ).pack(side="right", padx=(0, 6))
 
         cols = ("Title", "Format", "Date", "Status", "Path")
         frame = tk.Frame(self, bg=T["bg"])
@@ -218,9 +1330,13 @@ class HistoryWindow(tk.Toplevel):
                          background=T["queue_bg"], fieldbackground=T["queue_bg"],
                          foreground=T["fg"])
         style.configure("History.Treeview.Heading", font=("Helvetica", 9, "bold"))
+        style.configure("Thumbs.Treeview", rowheight=THUMB_SIZE[1] + 4, font=("Helvetica", 9),
+                         background=T["queue_bg"], fieldbackground=T["queue_bg"],
+                         foreground=T["fg"])
 
-        self.tree = ttk.Treeview(frame, columns=cols, show="headings",
-                                  style="History.Treeview", selectmode="browse")
+        self.tree = ttk.Treeview(frame, columns=cols, show="tree headings",
+                                  style="Thumbs.Treeview", selectmode="browse")
+        self.tree.column("#0", width=THUMB_SIZE[0] + 8, stretch=False)
         widths = [220, 55, 120, 60, 200]
         for col, w in zip(cols, widths):
             self.tree.heading(col, text=col)
@@ -244,9 +1360,10 @@ class HistoryWindow(tk.Toplevel):
             self.tree.delete(row)
         for title, url, fmt, path, date, status in get_history():
             tag = "done" if status == "success" else "error"
-            self.tree.insert("", "end",
+            iid = self.tree.insert("", "end",
                 values=(title or url, fmt.upper(), date, status.title(), path),
                 tags=(tag,))
+            self.thumbs.get(video_id(url), lambda img, i=iid: self.tree.item(i, image=img))
 
     def _clear(self):
         if messagebox.askyesno("Clear History", "Delete all download history?", parent=self):
@@ -275,6 +1392,211 @@ class HistoryWindow(tk.Toplevel):
         if sys.platform == "win32":
             os.startfile(path)
 
+# ── Stats window ──────────────────────────────────────────────────────────────
+class StatsWindow(tk.Toplevel):
+    RANGES = {"Last 7 days": 7, "Last 30 days": 30, "Last 90 days": 90, "Last year": 365}
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.title("Download Stats")
+        self.geometry("640x520")
+        self.configure(bg=T["bg"])
+        self.transient(parent)
+        _set_icon(self)
+
+        top = tk.Frame(self, bg=T["bg"])
+        top.pack(fill="x", padx=16, pady=(14, 6))
+        tk.Label(top, text="Download Stats", font=("Helvetica", 13, "bold"),
+                 bg=T["bg"], fg=T["fg"]).pack(side="left")
+        self.range_var = tk.StringVar(value="Last 30 days")
+        box = ttk.Combobox(top, textvariable=self.range_var, values=list(self.RANGES),
+                           state="readonly", font=("Helvetica", 9), width=12)
+        box.pack(side="right")
+        box.bind("<<ComboboxSelected>>", lambda e: self._load())
+
+        self.summary_var = tk.StringVar()
+        tk.Label(self, textvariable=self.summary_var, font=("Helvetica", 9),
+                 bg=T["bg"], fg=T["fg"], justify="left", anchor="w").pack(fill="x", padx=16)
+
+        self.chart = tk.Canvas(self, height=120, bg=T["queue_bg"],
+                               highlightthickness=1, highlightbackground=T["border"])
+        self.chart.pack(fill="x", padx=16, pady=(6, 8))
+        self.chart.bind("<Configure>", lambda e: self._draw_chart())
+
+        tk.Label(self, text="Top failure reasons", font=("Helvetica", 9, "bold"),
+                 bg=T["bg"], fg=T["fg"]).pack(anchor="w", padx=16)
+        frame = tk.Frame(self, bg=T["bg"])
+        frame.pack(fill="both", expand=True, padx=16, pady=(2, 14))
+        self.fail_tree = ttk.Treeview(frame, columns=("Reason", "Count"), show="headings",
+                                       style="History.Treeview", height=6)
+        self.fail_tree.heading("Reason", text="Reason")
+        self.fail_tree.heading("Count", text="Count")
+        self.fail_tree.column("Reason", width=500, anchor="w")
+        self.fail_tree.column("Count", width=60, anchor="center")
+        self.fail_tree.pack(fill="both", expand=True)
+
+        self.daily = []
+        self._load()
+
+    def _load(self):
+        days  = self.RANGES.get(self.range_var.get(), 30)
+        since = datetime.fromordinal(datetime.now().toordinal() - days + 1).strftime("%Y-%m-%d")
+        self.daily = get_daily_stats(since)
+
+        total = sum(r[1] for r in self.daily)
+        ok    = sum(r[2] for r in self.daily)
+        size  = sum(r[3] for r in self.daily)
+        secs  = sum(r[4] for r in self.daily)
+        rate  = f"{ok * 100 / total:.0f}%" if total else "—"
+        speed = f"{_fmt_bytes(size / secs)}/s" if secs else "—"
+        fmts  = ", ".join(f"{f.upper()} {n}" for f, n, _ in get_format_stats(since)) or "—"
+        self.summary_var.set(
+            f"Downloads: {total}    Successful: {ok} ({rate})    Data: {_fmt_bytes(size)}\n"
+            f"Average throughput: {speed}    By format: {fmts}")
+
+        for row in self.fail_tree.get_children():
+            self.fail_tree.delete(row)
+        for reason, count in get_failure_reasons(since):
+            self.fail_tree.insert("", "end", values=(reason, count))
+        self._draw_chart()
+
+    def _draw_chart(self):
+        """Daily volume bars; the red part of each bar is failures."""
+        c = self.chart
+        c.delete("all")
+        w, h = c.winfo_width(), c.winfo_height()
+        if not self.daily or w < 10:
+            c.create_text(w // 2, h // 2, text="No downloads in this period",
+                          fill=T["status_fg"], font=("Helvetica", 9))
+            return
+        peak = max(r[1] for r in self.daily)
+        bar  = max(1.0, (w - 20) / len(self.daily))
+        for i, (day, total, ok, _, _) in enumerate(self.daily):
+            x0 = 10 + i * bar
+            x1 = x0 + max(1.0, bar - 2)
+            y_total = h - 18 - (h - 30) * total / peak
+            y_ok    = h - 18 - (h - 30) * ok / peak
+            c.create_rectangle(x0, y_total, x1, y_ok, fill=T["tag_error"], width=0)
+            c.create_rectangle(x0, y_ok, x1, h - 18, fill=T["tag_done"], width=0)
+        c.create_text(10, h - 4, text=self.daily[0][0], anchor="sw",
+                      fill=T["status_fg"], font=("Helvetica", 7))
+        c.create_text(w - 10, h - 4, text=self.daily[-1][0], anchor="se",
+                      fill=T["status_fg"], font=("Helvetica", 7))
+        c.create_text(w - 10, 4, text=f"max {peak}/day", anchor="ne",
+                      fill=T["status_fg"], font=("Helvetica", 7))
+
+# ── Subscriptions window ──────────────────────────────────────────────────────
+class SubscriptionsWindow(tk.Toplevel):
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.app = parent
+        self.title("Subscriptions")
+        self.geometry("700x420")
+        self.configure(bg=T["bg"])
+        self.transient(parent)
+        _set_icon(self)
+
+        top = tk.Frame(self, bg=T["bg"])
+        top.pack(fill="x", padx=16, pady=(14, 6))
+        tk.Label(top, text="Subscriptions", font=("Helvetica", 13, "bold"),
+                 bg=T["bg"], fg=T["fg"]).pack(side="left")
+        tk.Button(top, text="⟳ Sync All", font=("Helvetica", 9),
+                  bg=T["muted_btn_bg"], fg=T["muted_btn_fg"], relief="flat",
+                  cursor="hand2", padx=8, pady=3,
+                  command=lambda: self.app._sync_subscriptions(get_subscriptions())
+                  ).pack(side="right")
+
+        add_row = tk.Frame(self, bg=T["bg"])
+        add_row.pack(fill="x", padx=16, pady=(0, 6))
+        self.url_entry = tk.Entry(add_row, font=("Helvetica", 10), relief="flat", bd=4,
+                                  bg=T["entry_bg"], fg=T["entry_fg"],
+                                  highlightbackground=T["border"], highlightthickness=1)
+        self.url_entry.pack(side="left", fill="x", expand=True, ipady=3)
+        self.url_entry.bind("<Return>", lambda e: self._add())
+        parent._attach_context_menu(self.url_entry)
+        tk.Button(add_row, text="＋ Subscribe", font=("Helvetica", 9, "bold"),
+                  bg=T["btn_bg"], fg=T["btn_fg"], relief="flat", cursor="hand2",
+                  activebackground=T["btn_hover"], activeforeground=T["btn_fg"],
+                  padx=8, pady=3, command=self._add).pack(side="left", padx=(4, 0))
+
+        cols = ("Name", "Format", "Last Sync", "New", "URL")
+        frame = tk.Frame(self, bg=T["bg"])
+        frame.pack(fill="both", expand=True, padx=16)
+        self.tree = ttk.Treeview(frame, columns=cols, show="headings",
+                                  style="History.Treeview", selectmode="browse")
+        widths = [200, 60, 110, 40, 250]
+        for col, w in zip(cols, widths):
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=w, anchor="w")
+        sb = ttk.Scrollbar(frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=sb.set)
+        self.tree.pack(side="left", fill="both", expand=True)
+        sb.pack(side="right", fill="y")
+        self.tree.bind("<Button-3>", self._on_right_click)
+
+        opts = tk.Frame(self, bg=T["bg"])
+        opts.pack(fill="x", padx=16, pady=(6, 14))
+        tk.Label(opts, text="Sync every", font=("Helvetica", 9),
+                 bg=T["bg"], fg=T["fg"]).pack(side="left")
+        self.hours_var = tk.IntVar(value=parent.cfg.get("sub_sync_hours", 0))
+        tk.Spinbox(opts, from_=0, to=168, textvariable=self.hours_var, width=4,
+                   font=("Helvetica", 9), state="readonly", relief="flat",
+                   readonlybackground=T["entry_bg"],
+                   command=self._save_opts).pack(side="left", padx=4)
+        tk.Label(opts, text="hours (0 = off)", font=("Helvetica", 9),
+                 bg=T["bg"], fg=T["status_fg"]).pack(side="left")
+        self.auto_var = tk.BooleanVar(value=parent.cfg.get("sub_auto_download", False))
+        tk.Checkbutton(opts, text="Start downloading new videos automatically",
+                       variable=self.auto_var, font=("Helvetica", 9), bg=T["bg"], fg=T["fg"],
+                       activebackground=T["bg"], selectcolor=T["entry_bg"],
+                       command=self._save_opts).pack(side="right")
+
+        self._load()
+
+    def _load(self):
+        for row in self.tree.get_children():
+            self.tree.delete(row)
+        for sub in get_subscriptions():
+            self.tree.insert("", "end", iid=str(sub["id"]),
+                values=(sub["name"], sub["fmt"].upper(), sub["last_sync"] or "Never",
+                        sub["last_new"] or 0, sub["url"]))
+
+    def _add(self):
+        url = normalize_sub_url(self.url_entry.get())
+        if not url:
+            messagebox.showwarning("Invalid URL",
+                "Enter a YouTube channel or playlist URL, e.g.\n"
+                "https://www.youtube.com/@name or https://www.youtube.com/playlist?list=...",
+                parent=self)
+            return
+        add_subscription(url, self.app.format_var.get(), self.app.quality_var.get())
+        self.url_entry.delete(0, tk.END)
+        self._load()
+        # First sync records the baseline so only later uploads get queued
+        self.app._sync_subscriptions([s for s in get_subscriptions() if s["url"] == url])
+
+    def _on_right_click(self, event):
+        item = self.tree.identify_row(event.y)
+        if not item:
+            return
+        self.tree.selection_set(item)
+        sub = next((s for s in get_subscriptions() if str(s["id"]) == item), None)
+        menu = tk.Menu(self, tearoff=0, bg=T["bg"], fg=T["fg"],
+                       activebackground=T["btn_bg"], activeforeground=T["btn_fg"])
+        menu.add_command(label="Sync now",
+                         command=lambda: self.app._sync_subscriptions([sub]))
+        menu.add_command(label="Unsubscribe",
+                         command=lambda: (remove_subscription(sub["id"]), self._load()))
+        try:
+            menu.tk_popup(event.x_root, event.y_root)
+        finally:
+            menu.grab_release()
+
+    def _save_opts(self):
+        self.app.cfg["sub_sync_hours"]    = self.hours_var.get()
+        self.app.cfg["sub_auto_download"] = self.auto_var.get()
+        self.app.settings.save()
+
 # ── About window ──────────────────────────────────────────────────────────────
 class AboutWindow(tk.Toplevel):
     def __init__(self, parent):
@@ -346,15 +1668,39 @@ class KGYTDownloader(tk.Tk):
         self.resizable(False, False)
         self.configure(bg=T["bg"])
         _set_icon(self)
-        self.cfg = load_config()
+        self.settings = SettingsStore()
+        self.cfg = self.settings.data
         init_db()
+        self.engine = YtdlEngine()
+        self.thumbs = ThumbnailCache(self)
+        self._run_in_thread(lambda: prune_cache(self.cfg.get("cache_max_mb", CACHE_MAX_MB)))
+        self._run_in_thread(
+            lambda: sweep_staging(self.cfg.get("staging_dir", STAGING_DIR)),
+            on_done=lambda n: n and self._log(f"ℹ Removed {n} stale staging folder(s)"))
+        self.after(2000, self._scan_library)
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
 
         # Queue: list of dicts {url, fmt, quality, title, status, iid}
         self.queue = []
         self.is_downloading = False
+        self._info_cache = {}
+        self.sched_lock  = threading.Lock()
+        self.sched_state = {}
+        self._drag_iid   = None
+        self._workers    = 0
+        self._syncing    = False
+        self._subs_win   = None
+        self._log_queue  = queue.SimpleQueue()
+        self._ui_calls   = queue.SimpleQueue()
+        self._info_pool  = ThreadPoolExecutor(max_workers=2, thread_name_prefix="info")
 
         self._build_ui()
         self._restore_settings()
+        pending = self._queue_pending()
+        if pending:
+            self._log(f"📡 {pending} subscription item(s) still to download from last time")
+        self.after(SUB_CHECK_MS, self._sync_due)
+        self._flush_log()
 
     # ── UI ────────────────────────────────────────────────────────────────────
     def _build_ui(self):
@@ -371,6 +1717,7 @@ class KGYTDownloader(tk.Tk):
         for txt, cmd, tip in [
             ("⟳ Update yt-dlp", self._update_ytdlp, "Update the bundled yt-dlp to the latest version"),
             ("🕓 History",       self._open_history,  "View download history"),
+            ("📡 Subscriptions", self._open_subscriptions, "Channels and playlists synced for new videos"),
             ("ⓘ About",         lambda: AboutWindow(self), "About this app"),
         ]:
             b = tk.Button(btn_frame, text=txt, font=("Helvetica", 8), relief="flat",
@@ -397,14 +1744,39 @@ class KGYTDownloader(tk.Tk):
         self.url_entry.pack(side="left", fill="x", expand=True, ipady=5)
         self._attach_context_menu(self.url_entry)
 
+        preview_row = tk.Frame(url_outer, bg=T["bg"])
+        preview_row.pack(fill="x")
+        self.thumb_label = tk.Label(preview_row, bg=T["bg"])
+        self.thumb_label.pack(side="left")
         self.title_var = tk.StringVar(value="")
-        self.title_label = tk.Label(url_outer, textvariable=self.title_var,
+        self.title_label = tk.Label(preview_row, textvariable=self.title_var,
                                      font=("Helvetica", 8, "italic"),
                                      bg=T["bg"], fg=T["status_fg"], anchor="w")
-        self.title_label.pack(fill="x")
+        self.title_label.pack(side="left", fill="x", expand=True)
         self.url_entry.bind("<FocusOut>", lambda e: self._fetch_title())
         self.url_entry.bind("<Return>",   lambda e: self._add_to_queue())
 
+        # ── Preset row ────────────────────────────────────────────────────────
+        preset_row = tk.Frame(self, bg=T["bg"])
+        preset_row.pack(fill="x", padx=16, pady=(6, 0))
+        tk.Label(preset_row, text="Preset", font=("Helvetica", 9),
+                 bg=T["bg"], fg=T["fg"]).pack(side="left", padx=(0, 6))
+        self.preset_var = tk.StringVar(value="")
+        self.preset_box = ttk.Combobox(preset_row, textvariable=self.preset_var,
+                                        values=sorted(self.cfg.get("presets", {})),
+                                        state="readonly", font=("Helvetica", 9), width=18)
+        self.preset_box.pack(side="left")
+        self.preset_box.bind("<<ComboboxSelected>>", lambda e: self._apply_preset())
+        for txt, cmd, tip in [
+            ("Save as…", self._save_preset,   "Save the current options as a named preset"),
+            ("Delete",   self._delete_preset, "Delete the selected preset"),
+        ]:
+            b = tk.Button(preset_row, text=txt, font=("Helvetica", 8),
+                          bg=T["muted_btn_bg"], fg=T["muted_btn_fg"], relief="flat",
+                          cursor="hand2", padx=6, pady=2, command=cmd)
+            b.pack(side="left", padx=(4, 0))
+            Tooltip(b, tip)
+
         # ── Options row ───────────────────────────────────────────────────────
         opts = tk.Frame(self, bg=T["bg"])
         opts.pack(fill="x", **pad)
@@ -428,6 +1800,7 @@ class KGYTDownloader(tk.Tk):
                                          values=QUALITY_OPTIONS, state="readonly",
                                          font=("Helvetica", 10), width=8)
         self.quality_box.grid(row=1, column=1, sticky="w", padx=(0, 12))
+        self.quality_box.bind("<<ComboboxSelected>>", lambda e: self._save_opts())
 
         # Save folder
         tk.Label(opts, text="Save Folder", font=("Helvetica", 9),
@@ -447,6 +1820,48 @@ class KGYTDownloader(tk.Tk):
                   cursor="hand2", padx=6, pady=4,
                   command=self._pick_folder).pack(side="left", padx=(4, 0))
 
+        # Scheduling
+        tk.Label(opts, text="Schedule", font=("Helvetica", 9),
+                 bg=T["bg"], fg=T["fg"]).grid(row=2, column=0, sticky="w", padx=(0, 6),
+                                              pady=(4, 0))
+        self.policy_var = tk.StringVar(value=self.cfg.get("schedule_policy", "FIFO"))
+        policy_box = ttk.Combobox(opts, textvariable=self.policy_var,
+                                   values=list(SCHEDULE_POLICIES), state="readonly",
+                                   font=("Helvetica", 10), width=12)
+        policy_box.grid(row=3, column=0, sticky="w", padx=(0, 12))
+        policy_box.bind("<<ComboboxSelected>>", lambda e: self._save_opts())
+        Tooltip(policy_box, "Which pending item the next free download slot picks")
+
+        tk.Label(opts, text="Parallel", font=("Helvetica", 9),
+                 bg=T["bg"], fg=T["fg"]).grid(row=2, column=1, sticky="w", padx=(0, 6),
+                                              pady=(4, 0))
+        self.concurrency_var = tk.IntVar(value=self.cfg.get("concurrency", 1))
+        tk.Spinbox(opts, from_=1, to=8, textvariable=self.concurrency_var, width=4,
+                   font=("Helvetica", 10), state="readonly", relief="flat",
+                   readonlybackground=T["entry_bg"],
+                   command=self._save_opts).grid(row=3, column=1, sticky="w", padx=(0, 12))
+
+        # Staging folder
+        tk.Label(opts, text="Staging Folder", font=("Helvetica", 9),
+                 bg=T["bg"], fg=T["fg"]).grid(row=2, column=2, sticky="w", padx=(0, 6),
+                                              pady=(4, 0))
+        staging_row = tk.Frame(opts, bg=T["bg"])
+        staging_row.grid(row=3, column=2, sticky="ew", padx=(0, 12))
+        self.staging_var = tk.StringVar(value=self.cfg.get("staging_dir", STAGING_DIR))
+        staging_entry = tk.Entry(staging_row, textvariable=self.staging_var,
+                                  font=("Helvetica", 9), relief="flat", bd=4,
+                                  bg=T["entry_bg"], fg=T["entry_fg"],
+                                  highlightbackground=T["border"], highlightthickness=1,
+                                  state="readonly", readonlybackground=T["entry_bg"])
+        staging_entry.pack(side="left", fill="x", expand=True, ipady=4)
+        staging_btn = tk.Button(staging_row, text="Browse", font=("Helvetica", 8),
+                                bg=T["muted_btn_bg"], fg=T["muted_btn_fg"], relief="flat",
+                                cursor="hand2", padx=6, pady=4,
+                                command=self._pick_staging)
+        staging_btn.pack(side="left", padx=(4, 0))
+        Tooltip(staging_btn, "Fast local folder for in-progress files; finished files "
+                             "are moved into the save folder")
+
         # ── Checkboxes ────────────────────────────────────────────────────────
         chk_frame = tk.Frame(self, bg=T["bg"])
         chk_frame.pack(fill="x", padx=16, pady=(0, 4))
@@ -474,6 +1889,17 @@ class KGYTDownloader(tk.Tk):
         self.thumb_chk.pack(side="left", padx=(0, 12))
         self.meta_chk.pack(side="left", padx=(0, 12))
         self.playlist_chk.pack(side="left")
+
+        self.rate_var = tk.StringVar(value=self.cfg.get("rate_limit", ""))
+        rate_entry = tk.Entry(chk_frame, textvariable=self.rate_var, width=7,
+                              font=("Helvetica", 9), relief="flat", bd=3,
+                              bg=T["entry_bg"], fg=T["entry_fg"],
+                              highlightbackground=T["border"], highlightthickness=1)
+        rate_entry.pack(side="right")
+        rate_entry.bind("<KeyRelease>", lambda e: self._save_opts())
+        tk.Label(chk_frame, text="Rate limit", font=("Helvetica", 9),
+                 bg=T["bg"], fg=T["fg"]).pack(side="right", padx=(0, 4))
+        Tooltip(rate_entry, "Maximum download speed per item, e.g. 500K or 5M (empty = unlimited)")
         Tooltip(self.thumb_chk,  "Embed video thumbnail as album art (MP3 only)")
         Tooltip(self.meta_chk,   "Write title, uploader and year as ID3/MP4 tags")
         Tooltip(self.playlist_chk, "Download every video in the playlist instead of just the linked video")
@@ -498,7 +1924,7 @@ class KGYTDownloader(tk.Tk):
 
         style = ttk.Style(self)
         style.theme_use("clam")
-        style.configure("Queue.Treeview", rowheight=20, font=("Helvetica", 9),
+        style.configure("Queue.Treeview", rowheight=THUMB_SIZE[1] + 4, font=("Helvetica", 9),
                          background=T["queue_bg"], fieldbackground=T["queue_bg"],
                          foreground=T["fg"], borderwidth=0)
         style.configure("Queue.Treeview.Heading", font=("Helvetica", 9, "bold"))
@@ -509,11 +1935,12 @@ class KGYTDownloader(tk.Tk):
         style.configure("Horizontal.TProgressbar",
                          troughcolor=T["progress_trough"], background=T["btn_bg"])
 
-        cols = ("#", "Title", "Fmt", "Quality", "Status")
-        self.queue_tree = ttk.Treeview(queue_frame, columns=cols, show="headings",
-                                        style="Queue.Treeview", height=5,
+        cols = ("#", "Pri", "Title", "Fmt", "Quality", "Status")
+        self.queue_tree = ttk.Treeview(queue_frame, columns=cols, show="tree headings",
+                                        style="Queue.Treeview", height=4,
                                         selectmode="browse")
-        widths = [28, 310, 45, 65, 90]
+        self.queue_tree.column("#0", width=THUMB_SIZE[0] + 8, stretch=False)
+        widths = [28, 35, 203, 45, 65, 90]
         for col, w in zip(cols, widths):
             self.queue_tree.heading(col, text=col)
             self.queue_tree.column(col, width=w, anchor="w" if col == "Title" else "center")
@@ -522,12 +1949,15 @@ class KGYTDownloader(tk.Tk):
         self.queue_tree.tag_configure("error",   foreground=T["tag_error"])
         self.queue_tree.tag_configure("pending", foreground=T["tag_pending"])
         self.queue_tree.tag_configure("active",  foreground=T["tag_active"])
+        self.queue_tree.tag_configure("paused",  foreground=T["tag_pending"])
 
         qsb = ttk.Scrollbar(queue_frame, orient="vertical", command=self.queue_tree.yview)
         self.queue_tree.configure(yscrollcommand=qsb.set)
         self.queue_tree.pack(side="left", fill="both", expand=True)
         qsb.pack(side="right", fill="y")
         self.queue_tree.bind("<Button-3>", self._queue_right_click)
+        self.queue_tree.bind("<ButtonPress-1>", self._drag_start)
+        self.queue_tree.bind("<B1-Motion>", self._drag_motion)
 
         # Queue action buttons
         qbtn_frame = tk.Frame(self, bg=T["bg"])
@@ -577,7 +2007,60 @@ class KGYTDownloader(tk.Tk):
         self.cfg["playlist_mode"]   = self.playlist_var.get()
         self.cfg["format"]          = self.format_var.get()
         self.cfg["quality"]         = self.quality_var.get()
-        save_config(self.cfg)
+        self.cfg["schedule_policy"] = self.policy_var.get()
+        self.cfg["concurrency"]     = self.concurrency_var.get()
+        self.cfg["rate_limit"]      = self.rate_var.get().strip()
+        self.settings.save()
+
+    def _snapshot_opts(self):
+        """Options a queue item is downloaded with, frozen at enqueue time."""
+        rate = self.rate_var.get().strip()
+        return {"last_folder":     self.folder_var.get(),
+                "staging_dir":     self.staging_var.get() or STAGING_DIR,
+                "embed_thumbnail": self.embed_thumb_var.get(),
+                "embed_metadata":  self.embed_meta_var.get(),
+                "playlist_mode":   self.playlist_var.get(),
+                "rate_limit":      rate if RATE_RE.match(rate) else ""}
+
+    # ── Presets ───────────────────────────────────────────────────────────────
+    def _save_preset(self):
+        name = simpledialog.askstring("Save preset", "Preset name:", parent=self,
+                                      initialvalue=self.preset_var.get())
+        if not name or not name.strip():
+            return
+        self._save_opts()
+        self.cfg["last_folder"] = self.folder_var.get()
+        presets = self.cfg.setdefault("presets", {})
+        presets[name.strip()] = {k: self.cfg.get(k) for k in PRESET_KEYS}
+        self.preset_box.configure(values=sorted(presets))
+        self.preset_var.set(name.strip())
+        self.settings.save()
+
+    def _delete_preset(self):
+        name = self.preset_var.get()
+        presets = self.cfg.get("presets", {})
+        if name in presets and messagebox.askyesno(
+                "Delete preset", f"Delete preset \"{name}\"?", parent=self):
+            del presets[name]
+            self.preset_box.configure(values=sorted(presets))
+            self.preset_var.set("")
+            self.settings.save()
+
+    def _apply_preset(self):
+        p = self.cfg.get("presets", {}).get(self.preset_var.get())
+        if not p:
+            return
+        self.format_var.set(p.get("format") or "mp4")
+        self.quality_var.set(p.get("quality") or "Best")
+        self.embed_thumb_var.set(bool(p.get("embed_thumbnail")))
+        self.embed_meta_var.set(bool(p.get("embed_metadata")))
+        self.playlist_var.set(bool(p.get("playlist_mode")))
+        self.rate_var.set(p.get("rate_limit") or "")
+        self.concurrency_var.set(p.get("concurrency") or 1)
+        if p.get("last_folder"):
+            self.folder_var.set(p["last_folder"])
+            self.cfg["last_folder"] = p["last_folder"]
+        self._on_format_change()
 
     def _on_format_change(self):
         is_mp3 = self.format_var.get() == "mp3"
@@ -592,26 +2075,40 @@ class KGYTDownloader(tk.Tk):
         if d:
             self.folder_var.set(d)
             self.cfg["last_folder"] = d
-            save_config(self.cfg)
+            self.settings.save()
+
+    def _pick_staging(self):
+        d = filedialog.askdirectory(title="Select staging folder",
+                                     initialdir=self.staging_var.get() or tempfile.gettempdir())
+        if d:
+            self.staging_var.set(d)
+            self.cfg["staging_dir"] = d
+            self.settings.save()
 
     # ── URL / title fetch ─────────────────────────────────────────────────────
     def _fetch_title(self):
         url = self.url_entry.get().strip()
         if not url or not is_valid_yt_url(url):
             self.title_var.set("" if not url else "⚠ URL doesn't look like a valid YouTube link")
+            self.thumb_label.configure(image="")
             return
         self.title_var.set("Fetching title…")
+        self.thumb_label.configure(image="")
+
+        def show_thumb(img):
+            if self.url_entry.get().strip() == url:
+                self.thumb_label.configure(image=img)
+        self.thumbs.get(video_id(url), show_thumb)
 
         def task():
             try:
-                kwargs = {}
-                if sys.platform == "win32":
-                    kwargs["creationflags"] = subprocess.CREATE_NO_WINDOW
-                r = subprocess.run(
-                    [_bin("yt-dlp"), "--no-playlist", "--print", "title", "--no-download", url],
-                    capture_output=True, text=True, timeout=15, **kwargs)
-                title = r.stdout.strip().splitlines()[0] if r.returncode == 0 else ""
+                info, elapsed = self.engine.extract(url)
+                self._info_cache[url] = info
+                title = info.get("title", "")
                 self.after(0, lambda: self.title_var.set(f"📹 {title}" if title else ""))
+                n = len(self.engine.timings)
+                self._log(f"ℹ Metadata for item #{n} extracted in {elapsed:.2f}s"
+                          + (" (warm)" if n > 1 else " (cold)"))
             except Exception:
                 self.after(0, lambda: self.title_var.set(""))
 
@@ -635,55 +2132,200 @@ class KGYTDownloader(tk.Tk):
         if err:
             messagebox.showerror("Missing files", err, parent=self)
             return
+        fmt, quality = self.format_var.get(), self.quality_var.get()
+        have = find_in_library(video_id(url), fmt,
+                               int(quality[:-1]) if quality.endswith("p") else 0)
+        if have and not messagebox.askyesno("Already downloaded",
+                f"This video is already in your library:\n{have}\n\nAdd it anyway?",
+                parent=self):
+            return
 
-        fmt     = self.format_var.get()
-        quality = self.quality_var.get()
-        title   = self.title_var.get().replace("📹 ", "") or url
-        n       = len(self.queue) + 1
+        self._enqueue(url, self.format_var.get(), self.quality_var.get(),
+                      self.title_var.get().replace("📹 ", "") or url,
+                      self._info_cache.pop(url, None))
+        self.url_entry.delete(0, tk.END)
+        self.title_var.set("")
+        self.thumb_label.configure(image="")
 
+    def _enqueue(self, url, fmt, quality, title, info=None, source=None, opts=None):
+        n = len(self.queue) + 1
         iid = self.queue_tree.insert("", "end",
-            values=(n, title, fmt.upper(), quality if fmt == "mp4" else "—", "Pending"),
+            values=(n, 0, title, fmt.upper(), quality if fmt == "mp4" else "—", "Pending"),
             tags=("pending",))
 
-        self.queue.append({"url": url, "fmt": fmt, "quality": quality,
-                           "title": title, "status": "pending", "iid": iid})
-        self.url_entry.delete(0, tk.END)
-        self.title_var.set("")
+        entry = {"url": url, "fmt": fmt, "quality": quality, "title": title,
+                 "status": "pending", "iid": iid, "priority": 0,
+                 "info": info, "source": source, "opts": opts or self._snapshot_opts()}
+        with self.sched_lock:
+            self.queue.append(entry)
+        self.thumbs.get(video_id(url), lambda img: self.queue_tree.item(iid, image=img))
+        # Duration and source feed the scheduling policies
+        if entry["info"] is None:
+            entry["info_job"] = self._info_pool.submit(self._prefetch_info, entry)
+        if self.is_downloading:
+            self._spawn_workers()
+        return entry
 
     def _clear_queue(self):
         if self.is_downloading:
-            messagebox.showwarning("Downloading", "Cannot clear queue while downloading.", parent=self)
-            return
-        self.queue.clear()
+            if not messagebox.askyesno("Downloading",
+                    "Cancel running downloads and clear the queue?", parent=self):
+                return
+            for entry in self.queue:
+                if entry["status"] in ("pending", "active", "paused"):
+                    self._stop_entry(entry, "cancel")
+        with self.sched_lock:
+            self.queue.clear()
         for row in self.queue_tree.get_children():
             self.queue_tree.delete(row)
 
+    def _entry_for(self, iid):
+        return next((q for q in self.queue if q["iid"] == iid), None)
+
     def _queue_right_click(self, event):
         item = self.queue_tree.identify_row(event.y)
         if not item:
             return
         self.queue_tree.selection_set(item)
-        idx = self.queue_tree.index(item)
-        entry = self.queue[idx] if idx < len(self.queue) else None
+        entry = self._entry_for(item)
+        status = entry["status"] if entry else ""
+        state = "normal" if status == "pending" else "disabled"
         menu = tk.Menu(self, tearoff=0, bg=T["bg"], fg=T["fg"],
                        activebackground=T["btn_bg"], activeforeground=T["btn_fg"])
+        menu.add_command(label="Download now (urgent)", state=state,
+                         command=lambda: self._make_urgent(entry))
+        menu.add_command(label="Raise priority", state=state,
+                         command=lambda: self._change_priority(entry, 1))
+        menu.add_command(label="Lower priority", state=state,
+                         command=lambda: self._change_priority(entry, -1))
+        menu.add_command(label="Move to top", state=state,
+                         command=lambda: self._move_queue_item(item, 0))
+        menu.add_separator()
+        if status == "paused":
+            menu.add_command(label="Resume", command=lambda: self._resume_entry(entry))
+        else:
+            menu.add_command(label="Pause",
+                             state="normal" if status in ("pending", "active") else "disabled",
+                             command=lambda: self._stop_entry(entry, "pause"))
+        menu.add_command(label="Cancel",
+                         state="normal" if status in ("active", "paused") else "disabled",
+                         command=lambda: self._cancel_entry(entry))
+        # Removing a failed subscription video also stops it being re-queued
         menu.add_command(label="Remove from queue",
-                         state="normal" if entry and entry["status"] == "pending" else "disabled",
-                         command=lambda: self._remove_queue_item(item, idx))
+                         state="normal" if status in ("pending", "error", "cancelled",
+                                                      "success") else "disabled",
+                         command=lambda: self._remove_queue_item(item))
         try:
             menu.tk_popup(event.x_root, event.y_root)
         finally:
             menu.grab_release()
 
-    def _remove_queue_item(self, iid, idx):
+    def _remove_queue_item(self, iid):
+        entry = self._entry_for(iid)
+        if entry and entry.get("source"):
+            settle_pending(video_id(entry["url"]))
         self.queue_tree.delete(iid)
-        if idx < len(self.queue):
-            self.queue.pop(idx)
-        # Renumber
+        with self.sched_lock:
+            self.queue[:] = [q for q in self.queue if q["iid"] != iid]
+        self._renumber_queue()
+
+    def _renumber_queue(self):
         for i, item in enumerate(self.queue_tree.get_children()):
-            vals = list(self.queue_tree.item(item, "values"))
-            vals[0] = i + 1
-            self.queue_tree.item(item, values=vals)
+            self.queue_tree.set(item, "#", i + 1)
+
+    def _change_priority(self, entry, delta):
+        entry["priority"] = entry.get("priority", 0) + delta
+        self.queue_tree.set(entry["iid"], "Pri", entry["priority"])
+
+    def _move_queue_item(self, iid, index):
+        """Move a row in queue_tree and keep self.queue in the same order."""
+        self.queue_tree.move(iid, "", index)
+        order = {item: i for i, item in enumerate(self.queue_tree.get_children())}
+        with self.sched_lock:
+            self.queue.sort(key=lambda q: order.get(q["iid"], len(order)))
+        self._renumber_queue()
+
+    # ── Pause / resume / cancel ───────────────────────────────────────────────
+    def _stop_entry(self, entry, reason):
+        """Pause, cancel or preempt an item; only cancel discards its staging dir."""
+        with self.sched_lock:
+            status = entry["status"]
+            if status == "active":
+                entry["stop"] = reason
+                proc = entry.get("proc")
+            elif status in ("pending", "paused"):
+                entry["status"] = "paused" if reason == "pause" else "cancelled"
+                proc = None
+            else:
+                return
+        if status == "active":
+            self._set_queue_status(entry, "paused", "Stopping…")
+            if proc is not None:
+                self._run_in_thread(lambda: kill_process_tree(proc))
+        elif entry["status"] == "paused":
+            self._set_queue_status(entry, "paused", "Paused ⏸")
+        else:
+            self._set_queue_status(entry, "error", "Cancelled")
+            self._discard_job_dir(entry)
+
+    def _cancel_entry(self, entry):
+        if entry.get("source"):
+            settle_pending(video_id(entry["url"]))
+        self._stop_entry(entry, "cancel")
+
+    def _resume_entry(self, entry):
+        with self.sched_lock:
+            if entry["status"] != "paused":
+                return
+            entry["status"] = "pending"
+        self._set_queue_status(entry, "pending", "Pending")
+        if self.is_downloading:
+            self._spawn_workers()
+
+    def _make_urgent(self, entry):
+        """Run entry next, preempting the lowest-priority download if all slots are busy."""
+        top = max((q.get("priority", 0) for q in self.queue), default=0)
+        entry["urgent"] = True
+        entry["priority"] = top + 1
+        self.queue_tree.set(entry["iid"], "Pri", entry["priority"])
+        if not self.is_downloading:
+            self._start_queue()
+            return
+        with self.sched_lock:
+            active = [q for q in self.queue if q["status"] == "active" and not q.get("stop")]
+            slots  = max(1, self.cfg.get("concurrency", 1))
+        if len(active) < slots:
+            self._spawn_workers()
+            return
+        victim = min(active, key=lambda q: q.get("priority", 0))
+        if victim.get("priority", 0) < entry["priority"]:
+            self._log(f"⏸ Preempting: {victim['title']}")
+            self._stop_entry(victim, "preempt")
+
+    def _discard_job_dir(self, entry):
+        job_dir = entry.pop("job_dir", None)
+        if job_dir:
+            shutil.rmtree(job_dir, ignore_errors=True)
+
+    def _keep_job_dir(self, entry):
+        """Rename a job dir so cleanup and sweep_staging leave it alone."""
+        job_dir = entry.pop("job_dir")
+        kept = os.path.join(os.path.dirname(job_dir), "failed-" + os.path.basename(job_dir)[4:])
+        try:
+            os.replace(job_dir, kept)
+        except OSError:
+            kept = job_dir
+        return kept
+
+    def _drag_start(self, event):
+        item = self.queue_tree.identify_row(event.y)
+        entry = self._entry_for(item) if item else None
+        self._drag_iid = item if entry and entry["status"] == "pending" else None
+
+    def _drag_motion(self, event):
+        target = self.queue_tree.identify_row(event.y)
+        if self._drag_iid and target and target != self._drag_iid:
+            self._move_queue_item(self._drag_iid, self.queue_tree.index(target))
 
     # ── Download queue ────────────────────────────────────────────────────────
     def _start_queue(self):
@@ -697,51 +2339,148 @@ class KGYTDownloader(tk.Tk):
         self.dl_btn.configure(state="disabled")
         self.progress.start(12)
         self._clear_console()
-        threading.Thread(target=self._process_queue, daemon=True).start()
-
-    def _process_queue(self):
-        folder = self.folder_var.get()
-        for entry in self.queue:
-            if entry["status"] != "pending":
-                continue
+        self._spawn_workers()
+
+    def _spawn_workers(self):
+        """Top the worker pool up to the configured concurrency."""
+        with self.sched_lock:
+            n = max(1, self.cfg.get("concurrency", 1)) - self._workers
+            self._workers += max(n, 0)
+        for _ in range(n):
+            threading.Thread(target=self._queue_worker, daemon=True).start()
+
+    def _next_entry(self):
+        """Let the active scheduling policy pick the next pending item; urgent ones first."""
+        with self.sched_lock:
+            pending = [q for q in self.queue if q["status"] == "pending"]
+            if pending:
+                urgent = [q for q in pending if q.get("urgent")]
+                if urgent:
+                    # The most recent "Download now" carries the highest priority
+                    entry = max(urgent, key=lambda q: q.get("priority", 0))
+                else:
+                    policy = SCHEDULE_POLICIES.get(self.cfg.get("schedule_policy"), pick_fifo)
+                    entry = policy(pending, self.sched_state)
+                entry["status"] = "active"
+                entry["stop"] = None
+                return entry
+            self._workers -= 1
+            finished = self._workers == 0
+        # after() from a worker waits for the Tk thread, which also takes
+        # sched_lock, so it must only be called once the lock is released
+        if finished:
+            self.after(0, self._queue_finished)
+        return None
+
+    def _queue_worker(self):
+        while True:
+            entry = self._next_entry()
+            if entry is None:
+                return
             self.after(0, lambda e=entry: self._set_queue_status(e, "active", "Downloading…"))
             self.after(0, lambda t=entry["title"]: self._set_status(f"Downloading: {t}"))
             self.after(0, lambda t=entry["title"]: self._log(f"\n▶ Starting: {t}"))
             self.after(0, lambda: self._log("─" * 55))
 
-            result, out_path = self._download_one(entry, folder)
+            t0 = time.perf_counter()
+            result, out_path = self._download_one(entry)
+            elapsed = time.perf_counter() - t0
+            stop = entry.pop("stop", None)
+            entry.pop("proc", None)
+            if stop == "pause":
+                entry["status"] = "paused"
+                self.after(0, lambda e=entry: self._set_queue_status(e, "paused", "Paused ⏸"))
+                self.after(0, lambda t=entry["title"]: self._log(f"⏸ Paused: {t}"))
+                continue
+            if stop == "preempt":
+                # Keeps its raised priority but no longer jumps the queue
+                entry.pop("urgent", None)
+                entry["status"] = "pending"
+                self.after(0, lambda e=entry: self._set_queue_status(e, "pending", "Pending"))
+                continue
+            if stop == "cancel":
+                entry["status"] = "cancelled"
+                self._discard_job_dir(entry)
+                self.after(0, lambda e=entry: self._set_queue_status(e, "error", "Cancelled"))
+                self.after(0, lambda t=entry["title"]: self._log(f"✕ Cancelled: {t}"))
+                continue
             entry["status"] = "success" if result == "success" else "error"
+            entry.pop("urgent", None)
 
             if result == "success":
                 self.after(0, lambda e=entry: self._set_queue_status(e, "done", "Done ✓"))
                 self.after(0, lambda: self._log("✓ Complete!"))
-                add_history(entry["title"], entry["url"], entry["fmt"], out_path, "success")
+                size = os.path.getsize(out_path) if out_path and os.path.isfile(out_path) else None
+                add_history(entry["title"], entry["url"], entry["fmt"], out_path, "success",
+                            size, elapsed)
+                if size is not None:
+                    index_file(out_path, video_id(entry["url"]))
+                if entry.get("source"):
+                    settle_pending(video_id(entry["url"]))
+                self.after(0, self._add_library_root, entry["opts"]["last_folder"])
             else:
                 self.after(0, lambda e=entry: self._set_queue_status(e, "error", "Error ✗"))
                 self.after(0, lambda r=result: self._log(f"✗ {r.replace('error:','')}"))
-                add_history(entry["title"], entry["url"], entry["fmt"], "", "error")
+                add_history(entry["title"], entry["url"], entry["fmt"], "", "error",
+                            None, elapsed, failure_reason(entry.pop("last_error", "")
+                                                          or result.replace("error:", "")))
 
-        self.after(0, self._queue_finished)
-
-    def _download_one(self, entry, folder):
+    def _download_one(self, entry):
+        job_dir, reservation = None, None
         try:
+            opts       = entry["opts"]
             ytdlp      = _bin("yt-dlp")
             ffmpeg_dir = os.path.dirname(_bin("ffmpeg"))
             url        = entry["url"]
             fmt        = entry["fmt"]
             quality    = entry["quality"]
-            out_tmpl   = os.path.join(folder, "%(title)s.%(ext)s")
-            playlist   = self.playlist_var.get()
-            embed_thumb = self.embed_thumb_var.get()
-            embed_meta  = self.embed_meta_var.get()
+            folder     = opts["last_folder"]
+            playlist   = opts["playlist_mode"]
+            embed_thumb = opts["embed_thumbnail"]
+            embed_meta  = opts["embed_metadata"]
+            staging    = opts["staging_dir"]
+            os.makedirs(staging, exist_ok=True)
+
+            # Preflight: staging holds the streams plus the merged/converted
+            # output until finalize, the save folder only the final file.
+            # Playlists aren't sized up front (that would mean extracting
+            # every entry), so they only get the DISK_MARGIN check.
+            est = None if playlist else estimate_size(self._entry_info(entry), fmt, quality)
+            if est:
+                reservation = DISK.reserve([(staging, est * 2), (folder, est)])
+                self._log(f"ℹ Estimated size {_fmt_bytes(est)}")
+            else:
+                DISK.reserve([(staging, 0), (folder, 0)])
+                if playlist:
+                    self._log("ℹ Playlist size unknown — only checking minimum free space")
+
+            # A paused/preempted job keeps its staging dir so yt-dlp can
+            # continue the partial downloads instead of starting over
+            job_dir = entry.get("job_dir")
+            if not job_dir or not os.path.isdir(job_dir):
+                job_dir = entry["job_dir"] = tempfile.mkdtemp(prefix="job-", dir=staging)
+            out_tmpl = os.path.join(job_dir, "%(title)s.%(ext)s")
 
             playlist_flag = [] if playlist else ["--no-playlist"]
+            rate_flag     = ["--limit-rate", opts["rate_limit"]] if opts["rate_limit"] else []
+
+            # Embed the thumbnail the previews already fetched rather than
+            # having yt-dlp download and convert it again
+            cover = None
+            if fmt == "mp3" and embed_thumb and not playlist and video_id(url):
+                try:
+                    cover = fetch_thumbnail(video_id(url))
+                except Exception:
+                    pass   # yt-dlp's --embed-thumbnail below takes over
 
             if fmt == "mp3":
                 cmd = [ytdlp, "-x", "--audio-format", "mp3", "--audio-quality", "0",
                        "--ffmpeg-location", ffmpeg_dir,
+                       *_cache_args(),
                        *playlist_flag,
-                       *(["--embed-thumbnail", "--convert-thumbnails", "jpg"] if embed_thumb else []),
+                       *rate_flag,
+                       *(["--embed-thumbnail", "--convert-thumbnails", "jpg"]
+                         if embed_thumb and not cover else []),
                        *(["--add-metadata"] if embed_meta else []),
                        "-o", out_tmpl, url]
             else:
@@ -749,40 +2488,100 @@ class KGYTDownloader(tk.Tk):
                 cmd = [ytdlp, "-f", fmt_str,
                        "--merge-output-format", "mp4",
                        "--ffmpeg-location", ffmpeg_dir,
+                       *_cache_args(),
                        *playlist_flag,
+                       *rate_flag,
                        *(["--add-metadata"] if embed_meta else []),
                        "-o", out_tmpl, url]
 
-            kwargs = {"stdout": subprocess.PIPE, "stderr": subprocess.STDOUT,
-                      "text": True, "bufsize": 1}
-            if sys.platform == "win32":
-                kwargs["creationflags"] = subprocess.CREATE_NO_WINDOW
-
             out_path = ""
-            with subprocess.Popen(cmd, **kwargs) as proc:
-                for line in proc.stdout:
-                    line = line.rstrip()
-                    if line:
-                        self.after(0, lambda l=line: self._log(l))
-                        if "[download] Destination:" in line or "Merging formats into" in line:
-                            out_path = line.split(":", 1)[-1].strip().strip('"')
-                proc.wait()
 
+            entry.pop("last_error", None)
+
+            def on_line(line):
+                nonlocal out_path
+                self._log(line)
+                if line.startswith("ERROR:"):
+                    entry["last_error"] = line
+                if line.startswith(("[download] Destination:",
+                                    "[ExtractAudio] Destination:")) \
+                        or "Merging formats into" in line:
+                    out_path = line.split(":", 1)[-1].strip().strip('"')
+
+            if entry.get("stop"):
+                return "stopped", ""
+            proc = SUPERVISOR.spawn(cmd, on_line=on_line)
+            with self.sched_lock:
+                entry["proc"] = proc
+                stopped = bool(entry.get("stop"))
+            if stopped:
+                kill_process_tree(proc)
+            proc.wait()
+
+            if entry.get("stop"):
+                return "stopped", ""
             if proc.returncode == 0:
-                return "success", out_path
+                if cover and out_path:
+                    # Cover art is cosmetic: keep the MP3 without it on failure
+                    try:
+                        embed_cover(out_path, cover)
+                        self._log("ℹ Embedded cached thumbnail")
+                    except Exception as e:
+                        self._log(f"⚠ {e}")
+                try:
+                    return "success", finalize_staged(job_dir, folder, out_path)
+                except Exception as e:
+                    # The download itself is complete; don't throw it away
+                    self._log(f"⚠ Finished files kept in {self._keep_job_dir(entry)}")
+                    return f"error:Could not move into save folder: {e}", ""
+            if entry.get("last_error"):
+                return f"error:{friendly_error(entry['last_error'])}", ""
             return f"error:Process exited with code {proc.returncode}", ""
         except Exception as e:
             return f"error:{e}", ""
+        finally:
+            if reservation:
+                DISK.release(reservation)
+            if entry.get("stop") not in ("pause", "preempt"):
+                self._discard_job_dir(entry)
+
+    def _prefetch_info(self, entry):
+        if entry.get("info") is None:
+            try:
+                entry["info"], _ = self.engine.extract(entry["url"])
+            except Exception:
+                entry["info"] = {}
+
+    def _entry_info(self, entry):
+        # Wait for a prefetch that is already running rather than extracting
+        # the same URL twice; one still queued is cancelled and done here
+        job = entry.pop("info_job", None)
+        if job is not None and not job.cancel():
+            job.result()
+        self._prefetch_info(entry)
+        return entry["info"]
 
     def _queue_finished(self):
+        with self.sched_lock:
+            if self._workers:
+                return   # resumed/enqueued after the last worker retired
         self.progress.stop()
         self.dl_btn.configure(state="normal")
         self.is_downloading = False
         done  = sum(1 for q in self.queue if q["status"] == "success")
-        total = len(self.queue)
+        total = sum(1 for q in self.queue if q["status"] in ("success", "error"))
         self._set_status(f"Finished — {done}/{total} completed")
         self._log("─" * 55)
         self._log(f"✓ Queue finished: {done}/{total} successful")
+        first, warm = self.engine.stats()
+        if warm is not None:
+            self._log(f"ℹ Metadata extraction: first {first:.2f}s, later items avg {warm:.2f}s")
+        self._run_in_thread(lambda: prune_cache(self.cfg.get("cache_max_mb", CACHE_MAX_MB)))
+        stopped = sum(1 for q in self.queue if q["status"] in ("paused", "cancelled"))
+        if stopped:
+            self._log(f"ℹ {stopped} item(s) paused or cancelled")
+        if not total:
+            return
         if done < total:
             messagebox.showwarning("Queue complete",
                 f"{done}/{total} items downloaded successfully.\n"
@@ -799,37 +2598,166 @@ class KGYTDownloader(tk.Tk):
         self._log("Checking for yt-dlp updates…")
         self.progress.start(12)
 
-        def task():
-            try:
-                kwargs = {}
-                if sys.platform == "win32":
-                    kwargs["creationflags"] = subprocess.CREATE_NO_WINDOW
-                r = subprocess.run([_bin("yt-dlp"), "-U"],
-                                    capture_output=True, text=True, **kwargs)
-                output = (r.stdout + r.stderr).strip()
-                return output or "Update check complete."
-            except Exception as e:
-                return f"error:{e}"
-
-        def done(result):
+        def done(_):
             self.progress.stop()
-            self._log(result)
             self._set_status("yt-dlp update check complete")
+            self.engine.close()
 
-        self._run_in_thread(task, on_done=done)
+        try:
+            SUPERVISOR.spawn([_bin("yt-dlp"), "-U"], on_line=self._log,
+                             on_exit=lambda rc: self._post(done, rc))
+        except Exception as e:
+            done(None)
+            self._log(f"error:{e}")
 
     # ── History ───────────────────────────────────────────────────────────────
     def _open_history(self):
         HistoryWindow(self)
 
+    # ── Subscriptions ─────────────────────────────────────────────────────────
+    def _open_subscriptions(self):
+        if self._subs_win is not None and self._subs_win.winfo_exists():
+            self._subs_win.lift()
+            return
+        self._subs_win = SubscriptionsWindow(self)
+
+    def _sync_subscriptions(self, subs, auto=False):
+        """Sync subs in the background and queue whatever is new."""
+        subs = [s for s in subs if s]
+        if self._syncing or not subs:
+            return
+        self._syncing = True
+        self._log(f"📡 Syncing {len(subs)} subscription(s)…")
+
+        def task():
+            found = []
+            for sub in subs:
+                try:
+                    t0  = time.perf_counter()
+                    new = sync_subscription(self.engine, sub)
+                    self._log(f"📡 {sub['name']}: {len(new)} new "
+                              f"({time.perf_counter() - t0:.1f}s)")
+                    found.append((sub, new))
+                except Exception as e:
+                    self._log(f"✗ Sync failed for {sub['url']}: {e}")
+            return found
+
+        def done(found):
+            self._syncing = False
+            added = self._queue_pending()
+            self._set_status(f"Subscriptions synced — {added} new item(s) queued")
+            if self._subs_win is not None and self._subs_win.winfo_exists():
+                self._subs_win._load()
+            if added and auto and self.cfg.get("sub_auto_download") \
+                    and self.folder_var.get() and not self.is_downloading:
+                self._start_queue()
+
+        self._run_in_thread(task, on_done=done)
+
+    def _queue_pending(self):
+        """Queue pending subscription videos that aren't queued yet; return the count."""
+        queued, added = {q["url"] for q in self.queue}, 0
+        for source, fmt, quality, vid, title in get_pending_items():
+            url = f"https://www.youtube.com/watch?v={vid}"
+            if url not in queued:
+                queued.add(url)
+                self._enqueue(url, fmt, quality, title or vid, source=source)
+                added += 1
+        return added
+
+    def _sync_due(self):
+        hours = self.cfg.get("sub_sync_hours", 0)
+        if hours > 0:
+            now = datetime.now()
+            due = [s for s in get_subscriptions()
+                   if not s["last_sync"] or
+                   (now - datetime.strptime(s["last_sync"], "%Y-%m-%d %H:%M")).total_seconds()
+                   >= hours * 3600]
+            self._sync_subscriptions(due, auto=True)
+        self.after(SUB_CHECK_MS, self._sync_due)
+
+    # ── Library ───────────────────────────────────────────────────────────────
+    def _library_roots(self):
+        roots = set(self.cfg.get("library_roots", []))
+        roots.add(self.cfg.get("last_folder", ""))
+        roots.update(p.get("last_folder", "") for p in self.cfg.get("presets", {}).values())
+        return sorted(r for r in roots if r)
+
+    def _add_library_root(self, folder):
+        roots = self.cfg.setdefault("library_roots", [])
+        if folder and folder not in roots:
+            roots.append(folder)
+            self.settings.save()
+
+    def _scan_library(self, on_done=None):
+        roots = self._library_roots()
+
+        def task():
+            t0 = time.perf_counter()
+            stats = scan_library(roots)
+            fixed, missing = reconcile_history()
+            return stats, fixed, missing, time.perf_counter() - t0
+
+        def done(result):
+            stats, fixed, missing, elapsed = result
+            if any(stats.values()) or fixed:
+                self._log(f"ℹ Library: {stats['added']} added, {stats['moved']} moved, "
+                          f"{stats['removed']} removed; {fixed} history path(s) updated, "
+                          f"{missing} missing ({elapsed:.1f}s)")
+            if on_done:
+                on_done()
+
+        self._run_in_thread(task, on_done=done)
+
+    def _on_close(self):
+        # Children run in their own process group, so they'd outlive us
+        with self.sched_lock:
+            procs = []
+            for q in self.queue:
+                if q["status"] == "active":
+                    q["stop"] = "pause"   # not a failure; keep it out of history
+                    if q.get("proc") is not None:
+                        procs.append(q["proc"])
+        killers = [threading.Thread(target=kill_process_tree, args=(p,), daemon=True)
+                   for p in procs]
+        for t in killers:
+            t.start()
+        for t in killers:
+            t.join(6)
+        self._info_pool.shutdown(wait=False, cancel_futures=True)
+        self.settings.flush()
+        self.engine.close()
+        self.destroy()
+
     # ── Console / status ──────────────────────────────────────────────────────
     def _log(self, text):
-        def _append():
+        # Safe from any thread; lines are batched into the console by _flush_log
+        self._log_queue.put(text)
+
+    def _post(self, fn, *args):
+        # For supervisor callbacks: after() would stall the loop thread until
+        # Tk picks the call up, so queue it for the next _flush_log tick
+        self._ui_calls.put((fn, args))
+
+    def _flush_log(self):
+        lines = []
+        try:
+            while True:
+                lines.append(self._log_queue.get_nowait())
+        except queue.Empty:
+            pass
+        if lines:
             self.console.configure(state="normal")
-            self.console.insert(tk.END, text + "\n")
+            self.console.insert(tk.END, "\n".join(lines) + "\n")
             self.console.see(tk.END)
             self.console.configure(state="disabled")
-        self.after(0, _append)
+        try:
+            while True:
+                fn, args = self._ui_calls.get_nowait()
+                fn(*args)
+        except queue.Empty:
+            pass
+        self.after(LOG_FLUSH_MS, self._flush_log)
 
     def _clear_console(self):
         self.console.configure(state="normal")
@@ -841,9 +2769,8 @@ class KGYTDownloader(tk.Tk):
 
     def _set_queue_status(self, entry, tag, label):
         try:
-            vals = list(self.queue_tree.item(entry["iid"], "values"))
-            vals[4] = label
-            self.queue_tree.item(entry["iid"], values=vals, tags=(tag,))
+            self.queue_tree.set(entry["iid"], "Status", label)
+            self.queue_tree.item(entry["iid"], tags=(tag,))
         except Exception:
             pass
 